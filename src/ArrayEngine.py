@@ -0,0 +1,202 @@
+import numpy as np
+
+from League import League
+from PlayerStore import PlayerStore
+from Problem import DEFAULT_PROBLEM
+
+
+class ArrayEngine:
+    """Array-backed representation of leagues for batched fitness evaluation.
+
+    A solution (genome) is an int array mapping player index -> team index,
+    and a population is a 2-D (pop_size, n_players) matrix of genomes.
+    Players that are not assigned to any team are encoded as -1.
+    """
+    def __init__(self, players, problem=DEFAULT_PROBLEM):
+        self.players = players
+        self.problem = problem
+        self.num_teams = problem.num_teams
+        self.budget_limit = problem.budget_limit
+        if isinstance(players, PlayerStore):
+            # Read the columns directly, without creating the Player objects
+            self.index_of = dict(zip(players.ids.tolist(), range(len(players))))
+            self.skills = np.asarray(players.skills, dtype=np.float64)
+            self.salaries = np.asarray(players.salaries, dtype=np.float64)
+            slots = np.array(problem.position_index + [-1], dtype=np.int64)
+            codes = np.asarray(players.pos_codes, dtype=np.int64)
+            self.pos_codes = slots[np.minimum(codes, len(slots) - 1)]
+            if (self.pos_codes < 0).any():
+                raise ValueError("Players with a position outside the problem formation")
+        else:
+            self.index_of = {player.id: i for i, player in enumerate(players)}
+            self.skills = np.array([p.skill for p in players], dtype=np.float64)
+            self.salaries = np.array([p.salary for p in players], dtype=np.float64)
+            self.pos_codes = np.array([problem.positions.index(p.position) for p in players], dtype=np.int64)
+        self.quotas = np.array(problem.formation_counts, dtype=np.int64)
+
+    def encode(self, league):
+        """Encodes a League as a genome (player index -> team index)"""
+        return self.encode_population([league])[0]
+
+    def encode_population(self, population):
+        """Encodes a list of Leagues as a (pop_size, n_players) genome matrix"""
+        index_of = self.index_of
+        rows = []
+        for league in population:
+            row = [-1] * len(self.players)
+            for t, team in enumerate(league.teams):
+                for player in team.players:
+                    row[index_of[player.id]] = t
+            rows.append(row)
+        return np.array(rows, dtype=np.int16).reshape(len(rows), len(self.players))
+
+    def decode(self, genome):
+        """Builds a League view of a genome, for printing and export"""
+        league = League(self.problem)
+        for i, team_idx in enumerate(genome):
+            if team_idx >= 0:
+                league.teams[team_idx].add_player(self.players[i])
+        return league
+
+    def decode_population(self, genomes):
+        return [self.decode(genome) for genome in genomes]
+
+    def pack_population(self, population):
+        """
+        Packs a list of Leagues into integer arrays, keeping the order of the players inside every team
+
+        Returns (members, team_sizes): members is a (pop_size, n_players) matrix with the player
+        indices of every league listed team after team (padded with -1) and team_sizes a
+        (pop_size, num_teams) matrix with the number of players of every team.
+        """
+        index_of = self.index_of
+        # Player indices need more bits than team labels on pools over 32767 players
+        index_type = np.int16 if len(self.players) <= np.iinfo(np.int16).max else np.int32
+        members = np.full((len(population), len(self.players)), -1, dtype=index_type)
+        team_sizes = np.zeros((len(population), self.num_teams), dtype=np.int16)
+        for row, league in enumerate(population):
+            order = [index_of[player.id] for team in league.teams for player in team.players]
+            members[row, :len(order)] = order
+            team_sizes[row] = [len(team.players) for team in league.teams]
+        return members, team_sizes
+
+    def unpack_population(self, members, team_sizes):
+        """Rebuilds the Leagues packed by pack_population"""
+        population = []
+        for order, sizes in zip(members.tolist(), team_sizes.tolist()):
+            league = League(self.problem)
+            start = 0
+            for team, size in zip(league.teams, sizes):
+                team.set_players([self.players[i] for i in order[start:start + size]])
+                start += size
+            population.append(league)
+        return population
+
+    def random_population(self, pop_size):
+        """Creates pop_size random genomes, dealing each position group out to the teams
+        in formation order like BaseGeneticAlgorithm.create_random_individual"""
+        genomes = np.full((pop_size, len(self.players)), -1, dtype=np.int16)
+        for code, pos in enumerate(self.problem.positions):
+            members = np.flatnonzero(self.pos_codes == code)
+            # Team labels for the shuffled position group: team i gets the i-th block of slots
+            slots = np.repeat(np.arange(self.num_teams), self.problem.formation[pos])[:len(members)]
+            # Random permutation of the group for every individual at once
+            order = np.argsort(np.random.random((pop_size, len(members))), axis=1)
+            chosen = members[order[:, :len(slots)]]
+            labels = np.broadcast_to(slots.astype(np.int16), chosen.shape)
+            np.put_along_axis(genomes, chosen, labels, axis=1)
+        return genomes
+
+    @staticmethod
+    def canonical_labels(genomes):
+        """Genome matrix with the teams of every individual renumbered in the order of their
+        first player, so that leagues differing only by a team permutation are equal"""
+        pop_size, n_players = genomes.shape
+        num_teams = int(genomes.max()) + 1 if genomes.size else 0
+        rows, cols = np.nonzero(genomes >= 0)
+        first = np.full((pop_size, num_teams), n_players, dtype=np.int64)
+        np.minimum.at(first, (rows, genomes[rows, cols]), cols)
+        # Rank of every team label by its first player
+        rank = np.argsort(np.argsort(first, axis=1, kind='stable'), axis=1).astype(genomes.dtype)
+        canonical = genomes.copy()
+        canonical[rows, cols] = rank[rows, genomes[rows, cols]]
+        return canonical
+
+    @staticmethod
+    def diversity(genomes, max_pairs=1000):
+        """Mean pairwise distance of a genome matrix: the fraction of players assigned
+        to different teams, averaged over pairs of individuals (0 = all clones).
+        Teams are compared in canonical order (see canonical_labels), so a team
+        permutation of a league counts as a clone.
+
+        Populations with more than max_pairs pairs are sampled deterministically:
+        individual i is compared with individuals i+1, ..., i+k (mod pop_size).
+        """
+        pop_size = len(genomes)
+        if pop_size < 2:
+            return 0.0
+        genomes = ArrayEngine.canonical_labels(genomes)
+        if pop_size * (pop_size - 1) // 2 <= max_pairs:
+            first, second = np.triu_indices(pop_size, 1)
+        else:
+            offsets = np.arange(1, max(1, max_pairs // pop_size) + 1)
+            first = np.repeat(np.arange(pop_size), len(offsets))
+            second = (first + np.tile(offsets, pop_size)) % pop_size
+        return float((genomes[first] != genomes[second]).mean())
+
+    def team_aggregates(self, genomes):
+        """Per-team salary totals, skill totals and position counts for a genome matrix.
+
+        Returns arrays of shape (pop_size, num_teams), (pop_size, num_teams)
+        and (pop_size, num_teams, n_positions).
+        """
+        genomes = np.atleast_2d(genomes)
+        pop_size = genomes.shape[0]
+        n_teams, n_pos = self.num_teams, len(self.problem.positions)
+        assigned = genomes >= 0
+        rows = np.broadcast_to(np.arange(pop_size)[:, np.newaxis], genomes.shape)
+        # Flatten (individual, team) into a single bin index so one bincount covers the population
+        team_bins = (rows * n_teams + genomes)[assigned]
+        skills = np.broadcast_to(self.skills, genomes.shape)[assigned]
+        salaries = np.broadcast_to(self.salaries, genomes.shape)[assigned]
+        pos_codes = np.broadcast_to(self.pos_codes, genomes.shape)[assigned]
+
+        size = pop_size * n_teams
+        skill_sums = np.bincount(team_bins, weights=skills, minlength=size).reshape(pop_size, n_teams)
+        salary_sums = np.bincount(team_bins, weights=salaries, minlength=size).reshape(pop_size, n_teams)
+        pos_counts = np.bincount(team_bins * n_pos + pos_codes,
+                                 minlength=size * n_pos).reshape(pop_size, n_teams, n_pos)
+        return salary_sums, skill_sums, pos_counts
+
+    def fitness_batch(self, genomes):
+        """Calculates the fitness of every genome in a (pop_size, n_players) matrix.
+
+        Mirrors BaseGeneticAlgorithm.fitness: the first team (in team order) with an
+        invalid formation scores 1000, the first team over budget scores 500 plus the
+        excess, otherwise the fitness is the std-dev of the average team skills.
+        """
+        return self.fitness_from_aggregates(*self.team_aggregates(genomes))
+
+    def fitness_from_aggregates(self, salary_sums, skill_sums, pos_counts):
+        """Fitness of every individual from the arrays returned by team_aggregates"""
+        pop_size, n_teams = salary_sums.shape
+
+        valid_formation = (pos_counts == self.quotas).all(axis=2)
+        over_budget = salary_sums > self.budget_limit
+
+        # Same closed form as LeagueStats.fitness: when every formation is valid all teams
+        # have the same size, and the std-dev is computed from the sums of the skill totals
+        # and of their squares (exact for integer skills).
+        total = skill_sums.sum(axis=1)
+        sq_total = (skill_sums * skill_sums).sum(axis=1)
+        variance = np.maximum(n_teams * sq_total - total * total, 0)
+        std_devs = np.sqrt(variance) / (n_teams * self.problem.team_size)
+
+        # Penalties are decided by the first failing team, as in the per-League loop
+        failing = ~valid_formation | over_budget
+        first = failing.argmax(axis=1)
+        rows = np.arange(pop_size)
+        penalty = np.where(valid_formation[rows, first],
+                           500.0 + (salary_sums[rows, first] - self.budget_limit),
+                           1000.0)
+        return np.where(failing.any(axis=1), penalty, std_devs)
@@ -0,0 +1,361 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import GeneticAlgorithm
+import LocalSearch
+from PlayerGenerator import generate_players
+from PlayerStore import DATA_PATH, load_player_store
+from Problem import Problem
+
+
+# Metrics where a higher value is better; every other metric (peak_bytes) should go down
+THROUGHPUT_METRICS = ('ops_per_sec', 'evaluations_per_sec')
+
+
+def load_players(path=DATA_PATH):
+    """Reads the player CSV (unnamed index column, Name, Position, Skill, Salary (€M))"""
+    return load_player_store(path).players()
+
+
+def benchmark_mutation_allocations(players, n_offspring=2000, seed=0):
+    """
+    Measures the memory allocated by every mutation operator
+
+    Every operator is applied with mutation_rate=1.0 to n_offspring random leagues and
+    the offspring are kept alive, so the allocations reported are what each child adds
+    to the heap (and to the garbage collector's work).
+    Returns {operator: {'blocks_per_offspring', 'bytes_per_offspring', 'ops_per_sec'}}.
+    """
+    ga = GeneticAlgorithm.BaseGeneticAlgorithm(players)
+    random.seed(seed)
+    parents = [ga.create_random_individual() for _ in range(n_offspring)]
+
+    results = {}
+    for name, mutation in GeneticAlgorithm.MUTATIONS.items():
+        random.seed(seed)
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        start_time = time.perf_counter()
+        offspring = [mutation(parent, mutation_rate=1.0) for parent in parents]
+        elapsed = time.perf_counter() - start_time
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        stats = after.compare_to(before, 'filename')
+        results[name] = {
+            'blocks_per_offspring': sum(stat.count_diff for stat in stats) / len(offspring),
+            'bytes_per_offspring': sum(stat.size_diff for stat in stats) / len(offspring),
+            'ops_per_sec': len(offspring) / elapsed,
+        }
+    return results
+
+
+def _throughput(op, n_calls, min_time):
+    """Calls op(i) for i = 0, 1, ... until n_calls calls and min_time seconds are both reached, returns calls/s"""
+    calls = 0
+    start_time = time.perf_counter()
+    while True:
+        for i in range(calls, calls + n_calls):
+            op(i)
+        calls += n_calls
+        elapsed = time.perf_counter() - start_time
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def _peak_bytes(op, n_calls):
+    """Peak heap growth (bytes, traced by tracemalloc) while calling op(i) n_calls times"""
+    tracemalloc.start()
+    try:
+        op(0)  # warm up lazily created objects so they are not counted
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        for i in range(n_calls):
+            op(i)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - base
+
+
+def _measure(op, n_calls, min_time):
+    """Runs op without tracing for its throughput, then again under tracemalloc for its peak memory"""
+    return {'ops_per_sec': _throughput(op, n_calls, min_time), 'peak_bytes': _peak_bytes(op, n_calls)}
+
+
+def _bench_players(num_teams, seed):
+    """Problem with num_teams teams and its synthetic player pool"""
+    problem = Problem(num_teams=num_teams)
+    return problem, generate_players(problem, seed=seed)
+
+
+def benchmark_operators(num_teams=5, pop_size=40, seed=0, min_time=0.2):
+    """
+    Times every selection, crossover and mutation operator, fitness, random
+    initialisation and one full generation on a synthetic pool of num_teams teams
+
+    Returns a list of records {'group', 'name', 'num_teams', 'pop_size', 'ops_per_sec',
+    'peak_bytes'}. Batched selections count one call per generation's worth of parents
+    (2 * pop_size), 'generation' records also report evaluations_per_sec.
+    """
+    problem, players = _bench_players(num_teams, seed)
+    # Cache disabled so that fitness and the generation really compute every value
+    ga = GeneticAlgorithm.GeneticAlgorithm_tournament_swap_team(
+        players, pop_size=pop_size, cache_size=0, verbose=False, problem=problem)
+    random.seed(seed)
+    np.random.seed(seed)
+    ga.initialize_population()
+    ga.evaluate_current_population()
+    population, fitnesses = ga.population, ga.population_fitness
+
+    def pair(i):
+        return population[i % pop_size], population[(i * 7 + 1) % pop_size]
+
+    def fitness(i):
+        league = population[i % pop_size]
+        league.stats = None
+        return ga.fitness(league)
+
+    # Every operator the GA classes are built from (see GeneticAlgorithm.ALGORITHMS)
+    ops = [('selection', name, lambda i, select=select: select(population, ga.fitness))
+           for name, select in GeneticAlgorithm.SELECTIONS.items()]
+    ops += [('selection', f"{name}_batch", lambda i, select=select: select(population, fitnesses, 2 * pop_size))
+            for name, select in GeneticAlgorithm.BATCH_SELECTIONS.items()]
+    ops += [('crossover', name, lambda i, cross=cross: cross(*pair(i), len(players)))
+            for name, cross in GeneticAlgorithm.CROSSOVERS.items()]
+    ops += [('mutation', name, lambda i, mutation=mutation: mutation(population[i % pop_size], mutation_rate=1.0))
+            for name, mutation in GeneticAlgorithm.MUTATIONS.items()]
+    ops += [
+        ('ga', 'fitness', fitness),
+        ('ga', 'create_random_individual', lambda i: ga.create_random_individual()),
+    ]
+
+    results = []
+    for group, name, op in ops:
+        random.seed(seed)
+        np.random.seed(seed)
+        record = {'group': group, 'name': name, 'num_teams': num_teams, 'pop_size': pop_size}
+        record.update(_measure(op, 20, min_time))
+        results.append(record)
+        # fitness() dropped the aggregates of the population, restore them for the next operators
+        for league in population:
+            league.get_stats()
+
+    # Full generations evolve ga's own population, so they are measured last
+    evaluations = ga.evaluations
+    start_time = time.perf_counter()
+    generations_per_sec = _throughput(lambda i: ga.evolve_generation(), 1, min_time)
+    elapsed = time.perf_counter() - start_time
+    record = {'group': 'ga', 'name': 'generation', 'num_teams': num_teams, 'pop_size': pop_size,
+              'ops_per_sec': generations_per_sec,
+              'evaluations_per_sec': (ga.evaluations - evaluations) / elapsed,
+              'peak_bytes': _peak_bytes(lambda i: ga.evolve_generation(), 1)}
+    results.append(record)
+    return results
+
+
+def benchmark_algorithms(team_counts=(5, 50), pop_sizes=(20, 40), generations=10, seed=0):
+    """
+    Runs every generated GeneticAlgorithm_* class for a fixed number of generations
+    on every (pool size, population size) combination
+
+    Returns a list of records with generations (ops_per_sec) and fitness evaluations
+    (evaluations_per_sec, incremental ones included: evaluations counts them) per second and the peak memory
+    of a second, traced run.
+    """
+    results = []
+    for num_teams in team_counts:
+        problem, players = _bench_players(num_teams, seed)
+        for pop_size in pop_sizes:
+            for cls_name, cls in GeneticAlgorithm.ALGORITHMS.items():
+                def run(i):
+                    random.seed(seed)
+                    np.random.seed(seed)
+                    ga = cls(players, pop_size=pop_size, generations=generations, verbose=False, problem=problem)
+                    ga.run()
+                    return ga
+
+                start_time = time.perf_counter()
+                ga = run(0)
+                elapsed = time.perf_counter() - start_time
+                tracemalloc.start()
+                try:
+                    run(0)
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                results.append({
+                    'group': 'algorithm', 'name': cls_name, 'num_teams': num_teams, 'pop_size': pop_size,
+                    'ops_per_sec': len(ga.fitness_history) / elapsed,
+                    'evaluations_per_sec': ga.evaluations / elapsed,
+                    'peak_bytes': peak,
+                })
+    return results
+
+
+def benchmark_time_to_target(players, target_fitness, solvers=None, seeds=(0, 1, 2), max_time=5.0,
+                             problem=None, **ga_kwargs):
+    """
+    Head-to-head comparison of optimizers on the time needed to reach target_fitness
+
+    solvers maps a name to an optimizer class (GeneticAlgorithm_* or a local search)
+    and defaults to every GA class and every local search. Each solver runs once per
+    seed, stopping at the target or after max_time seconds. ga_kwargs are passed to
+    the GA classes only (e.g. pop_size, or memetic_steps to time the memetic mode).
+    Returns one record per solver: 'reached' (fraction of the seeds
+    reaching the target), 'median_time' (seconds, over the runs reaching it, None if
+    none did), 'mean_evaluations' and 'mean_best_fitness'.
+    """
+    if solvers is None:
+        solvers = {**GeneticAlgorithm.ALGORITHMS, **LocalSearch.LOCAL_SEARCHES}
+    extra = {} if problem is None else {'problem': problem}
+    results = []
+    for name, cls in solvers.items():
+        times, evaluations, best = [], [], []
+        for seed in seeds:
+            random.seed(seed)
+            np.random.seed(seed)
+            # The generation / iteration cap is never the binding criterion
+            if issubclass(cls, LocalSearch.BaseLocalSearch):
+                solver = cls(players, iterations=10**9, verbose=False, target_fitness=target_fitness,
+                             max_time=max_time, **extra)
+            else:
+                solver = cls(players, generations=10**9, verbose=False, target_fitness=target_fitness,
+                             max_time=max_time, **extra, **ga_kwargs)
+            start_time = time.perf_counter()
+            solver.run()
+            elapsed = time.perf_counter() - start_time
+            if solver.best_fitness <= target_fitness:
+                times.append(elapsed)
+            evaluations.append(solver.evaluations)
+            best.append(solver.best_fitness)
+        results.append({
+            'name': name,
+            'target_fitness': target_fitness,
+            'reached': len(times) / len(seeds),
+            'median_time': float(np.median(times)) if times else None,
+            'mean_evaluations': float(np.mean(evaluations)),
+            'mean_best_fitness': float(np.mean(best)),
+        })
+    return results
+
+
+def run_suite(team_counts=(5, 50), pop_sizes=(20, 40), generations=10, seed=0, min_time=0.2):
+    """Runs the operator and algorithm benchmarks, returns {'meta': ..., 'results': [...]}"""
+    results = []
+    for num_teams in team_counts:
+        for pop_size in pop_sizes:
+            results += benchmark_operators(num_teams, pop_size, seed, min_time)
+    results += benchmark_algorithms(team_counts, pop_sizes, generations, seed)
+    meta = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'team_counts': list(team_counts),
+        'pop_sizes': list(pop_sizes),
+        'generations': generations,
+        'seed': seed,
+    }
+    return {'meta': meta, 'results': results}
+
+
+def result_key(record):
+    return f"{record['group']}/{record['name']}/teams={record['num_teams']}/pop={record['pop_size']}"
+
+
+def save_results(suite, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(suite, f, indent=2)
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(current, baseline, threshold=0.1):
+    """
+    Compares two suites produced by run_suite
+
+    A throughput metric regresses when it drops by more than threshold (relative),
+    peak_bytes when it grows by more than threshold. Benchmarks missing from either
+    suite are ignored. Returns a list of (key, metric, baseline, current, relative change).
+    """
+    baseline_records = {result_key(record): record for record in baseline['results']}
+    regressions = []
+    for record in current['results']:
+        key = result_key(record)
+        old = baseline_records.get(key)
+        if old is None:
+            continue
+        for metric in ('ops_per_sec', 'evaluations_per_sec', 'peak_bytes'):
+            if metric not in record or not old.get(metric):
+                continue
+            change = (record[metric] - old[metric]) / old[metric]
+            worse = -change if metric in THROUGHPUT_METRICS else change
+            if worse > threshold:
+                regressions.append((key, metric, old[metric], record[metric], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite for the GA operators and algorithms")
+    parser.add_argument('--output', default='benchmarks.json', help="JSON file the results are written to")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1, help="relative change reported as regression")
+    parser.add_argument('--teams', type=int, nargs='+', default=[5, 50], help="player-pool sizes, in teams")
+    parser.add_argument('--pop-sizes', type=int, nargs='+', default=[20, 40])
+    parser.add_argument('--generations', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-time', type=float, default=0.2, help="minimum seconds spent timing each operator")
+    parser.add_argument('--allocations', action='store_true', help="only report mutation allocations on the CSV")
+    parser.add_argument('--time-to-target', type=float, metavar='FITNESS',
+                        help="only compare the GAs and local searches on the time to reach FITNESS on the CSV")
+    parser.add_argument('--max-time', type=float, default=5.0, help="time limit of every --time-to-target run")
+    args = parser.parse_args(argv)
+
+    if args.time_to_target is not None:
+        results = benchmark_time_to_target(load_players(), args.time_to_target, max_time=args.max_time)
+        save_results({'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'max_time': args.max_time},
+                      'results': results}, args.output)
+        for record in sorted(results, key=lambda r: (-r['reached'], r['median_time'] or float('inf'))):
+            median = 'never' if record['median_time'] is None else f"{record['median_time']:.3f}s"
+            print(f"{record['name']:<60} reached {record['reached']:4.0%}, median {median:>8}, "
+                  f"{record['mean_evaluations']:10.0f} evals, mean best {record['mean_best_fitness']:.4f}")
+        return 0
+
+    if args.allocations:
+        players = load_players()
+        for name, result in benchmark_mutation_allocations(players).items():
+            print(f"{name:>16}: {result['blocks_per_offspring']:8.1f} blocks/offspring, "
+                  f"{result['bytes_per_offspring']:9.1f} bytes/offspring, {result['ops_per_sec']:10.0f} ops/s")
+        return 0
+
+    suite = run_suite(args.teams, args.pop_sizes, args.generations, args.seed, args.min_time)
+    save_results(suite, args.output)
+    for record in suite['results']:
+        evals = f", {record['evaluations_per_sec']:10.0f} evals/s" if 'evaluations_per_sec' in record else ''
+        print(f"{result_key(record):<80} {record['ops_per_sec']:12.1f} ops/s, "
+              f"{record['peak_bytes'] / 1024:9.1f} KiB peak{evals}")
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = compare_results(suite, load_results(args.baseline), args.threshold)
+        for key, metric, old, new, change in regressions:
+            print(f"REGRESSION {key} {metric}: {old:.1f} -> {new:.1f} ({change:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regression above {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,335 @@
+import math
+import time
+from bisect import bisect_left
+from itertools import combinations
+
+from League import League
+from Problem import DEFAULT_PROBLEM
+
+
+def _min_squares(total, n_parts):
+    """Smallest sum of squares of n_parts integers summing to total (the most even split)"""
+    q, r = divmod(total, n_parts)
+    return n_parts * q * q + r * (2 * q + 1)
+
+
+class BranchAndBound:
+    """
+    Exact solver of the league-balancing problem for small instances
+
+    Teams are filled one after the other by enumerating, position by position, the
+    combinations of the still available players. Team permutations are broken by
+    requiring the first-position players of the teams (e.g. the goalkeepers) to come
+    in increasing order. Everything is computed on the integer team skill sums S:
+    the fitness is sqrt(V) / (num_teams * team_size) with
+    V = num_teams * sum(S^2) - sum(S)^2, so comparisons are exact.
+
+    A branch is pruned when a lower bound on V reaches the incumbent: the remaining
+    skill total split as evenly as possible between the remaining teams (exactly when
+    every player has to be placed, relaxed over the reachable totals otherwise), or a
+    team that cannot stay within the budget. Subproblems (available players and
+    skill total of the filled teams) are memoized with their optimum or lower bound.
+
+    With max_time, the search stops at the time limit and reports the best solution
+    found with a lower bound on the optimal fitness. The optimum can be passed to a GA
+    as target_fitness to stop it as soon as it is reached.
+
+    The bounds are tight when the pool holds exactly the players needed (as in the
+    player CSV). With surplus players every team sum stays reachable near the root,
+    so only small pools are solved in reasonable time.
+    """
+    def __init__(self, players, problem=DEFAULT_PROBLEM, max_time=None, max_memo=1_000_000, verbose=True):
+        self.problem = problem
+        self.max_time = max_time
+        self.max_memo = max_memo
+        self.verbose = verbose
+        self.n = problem.num_teams
+        self.quotas = problem.formation_counts
+        # Players of the formation positions, grouped by position and sorted by skill;
+        # the index in self.players identifies a player (and its bit in the masks)
+        groups = [sorted((p for p in players if p.position == pos), key=lambda p: (p.skill, p.id))
+                  for pos in problem.positions]
+        self.players = [p for group in groups for p in group]
+        self.skills = [p.skill for p in self.players]
+        self.salaries = [p.salary for p in self.players]
+        starts = [0]
+        for group in groups:
+            starts.append(starts[-1] + len(group))
+        self.groups = [tuple(range(starts[i], starts[i + 1])) for i in range(len(groups))]
+        # Every available player has to be placed: the skill total is fixed
+        self.exact = all(len(group) == q * self.n for group, q in zip(self.groups, self.quotas))
+        self.total_skill = sum(self.skills)
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def fitness(self, v):
+        return math.sqrt(max(v, 0)) / (self.n * self.problem.team_size)
+
+    def league_v(self, league):
+        """V of a league, None when it is not a feasible solution for these players: every
+        player of the league has to come from the pool and be used once (and, when the
+        pool holds exactly the players needed, every player of the pool has to be used)"""
+        index = {p.id: i for i, p in enumerate(self.players)}
+        used = [index.get(p.id) for team in league.teams for p in team.players]
+        if len(league.teams) != self.n or not league.is_valid() or None in used or len(set(used)) != len(used):
+            return None
+        if self.exact and len(used) != len(self.players):
+            return None
+        sums = [sum(self.skills[index[p.id]] for p in team.players) for team in league.teams]
+        return self.n * sum(s * s for s in sums) - sum(sums) ** 2
+
+    def solve(self, incumbent=None):
+        """
+        Searches the optimal league; returns (best_solution, best_fitness, lower_bound)
+
+        incumbent (e.g. the best solution of a GA run) is used as the initial upper
+        bound; it is returned when nothing better exists. status is 'optimal' when the
+        search completed, 'time_limit' when it was stopped (lower_bound < best_fitness
+        unless the incumbent is optimal) and 'infeasible' when no valid league exists.
+        """
+        start_time = time.time()
+        self.deadline = None if self.max_time is None else start_time + self.max_time
+        self.best_v = math.inf
+        self.best_solution = None
+        self.open_bound = math.inf
+        self.timed_out = False
+        self.memo = {}
+        self.nodes = self.memo_hits = 0
+        v = None if incumbent is None else self.league_v(incumbent)
+        if v is not None:
+            self.best_solution = incumbent
+            self.log(f"Incumbent fitness: {self.fitness(v):.6f}")
+            cap = v
+        else:
+            # Without an incumbent nothing could be pruned: search below an increasing cap
+            # on V instead. A search that finds nothing proves that the optimum is at least
+            # the cap, and the memoized bounds carry over to the next search.
+            cap = 1
+        # Largest cap below which no solution exists
+        proven = 0
+        largest_v = (self.n * self.problem.team_size * max(self.skills, default=0)) ** 2
+
+        while True:
+            self.best_v = cap
+            found = self._search(0, tuple(self.groups), 0, 0, 0, -1)
+            if found is not None:
+                self.best_solution = self._league(found[1])
+                break
+            if self.timed_out or v is not None or cap == math.inf:
+                break
+            proven = cap
+            cap = cap * 4 if cap <= largest_v else math.inf
+
+        self.elapsed = time.time() - start_time
+        if self.best_solution is None:
+            self.status = 'infeasible' if not self.timed_out else 'time_limit'
+            self.best_fitness = float('inf')
+        else:
+            self.status = 'time_limit' if self.timed_out else 'optimal'
+            self.best_fitness = self.fitness(self.best_v)
+        if self.timed_out:
+            self.lower_bound = self.fitness(max(proven, min(self.open_bound, self.best_v)))
+        else:
+            self.lower_bound = self.best_fitness
+        self.log(f"Branch and bound {self.status} in {self.elapsed:.2f}s ({self.nodes} nodes, "
+                 f"{self.memo_hits} memo hits): best fitness {self.best_fitness:.6f}, "
+                 f"lower bound {self.lower_bound:.6f}")
+        return self.best_solution, self.best_fitness, self.lower_bound
+
+    def _league(self, teams):
+        league = League(self.problem)
+        for team, members in zip(league.teams, teams):
+            team.set_players([self.players[i] for i in members])
+        return league
+
+    def _rest_bound(self, Q, F, m, r_min, r_max):
+        """Lower bound on V when the filled teams have skill sums with total F and sum of
+        squares Q and the m remaining teams share a skill total between r_min and r_max"""
+        if m == 0:
+            return self.n * Q - F * F
+        if r_min == r_max:
+            return self.n * (Q + _min_squares(r_min, m)) - (F + r_min) ** 2
+        # n * R^2 / m - (F + R)^2 is convex in R: try both ends and around its minimum
+        candidates = {r_min, r_max}
+        if m < self.n:
+            r_star = F * m // (self.n - m)
+            candidates.update(min(max(r, r_min), r_max) for r in (r_star, r_star + 1))
+        return min(self.n * Q + self.n * r * r // m - (F + r) ** 2 for r in candidates)
+
+    def _search(self, k, avail, mask, F, Q, lo):
+        """
+        Best completion of the teams k.. from the available players (avail: player
+        indices per position), the filled teams having skill total F, sum of squares Q
+        and first-position minimum lo
+
+        Returns (bracket, teams) for the best completion improving on self.best_v, where
+        bracket is the part of V contributed by the remaining teams, or None.
+        """
+        n = self.n
+        base = n * Q - F * F
+        if k == n:
+            if base < self.best_v:
+                self.best_v = base
+                return 0, ()
+            return None
+
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % 1024 == 0 and time.time() > self.deadline:
+            self.timed_out = True
+        limit = self.best_v - base
+        # When every player is placed, the available players determine F and make lo irrelevant
+        key = mask if self.exact else (mask, F, lo)
+        entry = self.memo.get(key)
+        if entry is not None:
+            self.memo_hits += 1
+            exact, value, teams = entry
+            if exact and value < limit:
+                self.best_v = base + value
+                return value, teams
+            if value >= limit:
+                return None
+
+        m = n - k
+        # First-position players below lo can no longer be placed (see the class docstring)
+        avail = (tuple(i for i in avail[0] if i > lo),) + avail[1:]
+        if any(len(group) < q * m for group, q in zip(avail, self.quotas)):
+            return None
+        r_min = sum(sum(self.skills[i] for i in group[:q * m]) for group, q in zip(avail, self.quotas))
+        r_max = sum(sum(self.skills[i] for i in group[len(group) - q * m:]) for group, q in zip(avail, self.quotas))
+        node_bound = self._rest_bound(Q, F, m, r_min, r_max)
+        if self.timed_out:
+            self.open_bound = min(self.open_bound, node_bound)
+            return None
+        # The m teams cannot cost less than the cheapest players of every position
+        min_salaries = sum(sum(sorted(self.salaries[i] for i in group)[:q * m]) for group, q in zip(avail, self.quotas))
+        if min_salaries > m * self.problem.budget_limit:
+            node_bound = math.inf
+        if node_bound >= self.best_v:
+            self._remember(key, False, node_bound - base, None)
+            return None
+
+        candidates = self._candidates(avail, m, F, Q, r_min, r_max)
+        if self.timed_out:
+            self.open_bound = min(self.open_bound, node_bound)
+            return None
+        best = None
+        for team_bound, S, team in candidates:
+            if team_bound >= self.best_v:
+                break
+            if self.timed_out:
+                self.open_bound = min(self.open_bound, team_bound)
+                break
+            first = min(team[:self.quotas[0]])
+            rest = tuple(tuple(i for i in group if i not in team) for group in avail)
+            team_mask = sum(1 << i for i in team)
+            found = self._search(k + 1, rest, mask | team_mask, F + S, Q + S * S, first)
+            if found is not None:
+                best = (found[0] + n * S * S - 2 * F * S - S * S, (team,) + found[1])
+
+        if not self.timed_out:
+            if best is not None:
+                self._remember(key, True, best[0], best[1])
+            else:
+                self._remember(key, False, limit, None)
+        return best
+
+    def _remember(self, key, exact, value, teams):
+        if len(self.memo) < self.max_memo:
+            self.memo[key] = (exact, value, teams)
+
+    def _candidates(self, avail, m, F, Q, r_min, r_max):
+        """
+        Teams that can be formed from the available players with (lower bound on V, skill
+        sum, player indices), sorted by lower bound; teams over budget or whose bound
+        reaches the incumbent are skipped
+        """
+        n = self.n
+        budget = self.problem.budget_limit
+        n_pos = len(self.quotas)
+        # Combinations of every position as (skill sum, salary sum, players), by skill sum
+        combos = []
+        for j, (group, q) in enumerate(zip(avail, self.quotas)):
+            if j == 0 and self.exact:
+                # Every player is placed: the team takes the first remaining first-position player
+                players = ((group[0],) + rest for rest in combinations(group[1:], q - 1))
+            else:
+                players = combinations(group, q)
+            combos.append(sorted((sum(self.skills[i] for i in c), sum(self.salaries[i] for i in c), c)
+                                 for c in players))
+        # Cheapest salaries and smallest/largest skills that can complete a team from position j
+        min_salary = [0] * (n_pos + 1)
+        min_skill = [0] * (n_pos + 1)
+        max_skill = [0] * (n_pos + 1)
+        for j in range(n_pos - 1, -1, -1):
+            min_salary[j] = min_salary[j + 1] + min(salary for _, salary, _ in combos[j])
+            min_skill[j] = min_skill[j + 1] + combos[j][0][0]
+            max_skill[j] = max_skill[j + 1] + combos[j][-1][0]
+        # Skill total of the remaining teams, this one included, when every player has to be placed
+        R = r_min
+        T2 = self.total_skill ** 2
+        if not self.exact:
+            # Reachable totals of the other teams, from the players available before this one
+            q_rest = [q * (m - 1) for q in self.quotas]
+            rest_low = sum(sum(self.skills[i] for i in group[:q]) for group, q in zip(avail, q_rest))
+            rest_high = sum(sum(self.skills[i] for i in group[len(group) - q:]) for group, q in zip(avail, q_rest))
+
+        def partial_bound(s_low, s_high):
+            # Bound for a team sum between s_low and s_high, the rest split evenly (relaxed)
+            if m == 1:
+                return n * (Q + R * R) - T2 if s_low <= R <= s_high else math.inf
+            s_star = R // m
+            return min(n * (Q + s * s) + n * (R - s) ** 2 // (m - 1) - T2
+                       for s in {s_low, s_high, min(max(s_star, s_low), s_high), min(max(s_star + 1, s_low), s_high)})
+
+        def team_bound(S):
+            if self.exact:
+                return self._rest_bound(Q + S * S, F + S, m - 1, R - S, R - S)
+            return self._rest_bound(Q + S * S, F + S, m - 1, rest_low, rest_high)
+
+        out = []
+        last = combos[-1]
+        last_sums = [c[0] for c in last]
+
+        def add(S, C, chosen):
+            if C <= budget:
+                bound = team_bound(S)
+                if bound < self.best_v:
+                    out.append((bound, S, chosen))
+                    return True
+                return False
+            # Over budget: the bound of the skill sum decides whether to look further
+            return team_bound(S) < self.best_v
+
+        def extend(j, chosen, S, C):
+            if C + min_salary[j] > budget:
+                return
+            if self.exact and partial_bound(S + min_skill[j], S + max_skill[j]) >= self.best_v:
+                return
+            if j == n_pos - 1 and self.exact:
+                # The bound is convex in the team sum: scan the last position's combinations
+                # outwards from the one closest to the even split, while the bound allows
+                start = bisect_left(last_sums, R // m - S)
+                for k in range(start, len(last)):
+                    skill, salary, c = last[k]
+                    if not add(S + skill, C + salary, chosen + c):
+                        break
+                for k in range(start - 1, -1, -1):
+                    skill, salary, c = last[k]
+                    if not add(S + skill, C + salary, chosen + c):
+                        break
+                return
+            if j == n_pos:
+                add(S, C, chosen)
+                return
+            if self.deadline is not None and time.time() > self.deadline:
+                self.timed_out = True
+            if self.timed_out:
+                return
+            for skill, salary, c in combos[j]:
+                extend(j + 1, chosen + c, S + skill, C + salary)
+
+        extend(0, (), 0, 0)
+        out.sort()
+        return out
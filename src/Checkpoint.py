@@ -0,0 +1,106 @@
+import os
+import random
+
+import numpy as np
+
+
+# Counters of BaseGeneticAlgorithm saved with the run state
+COUNTERS = ('evaluations', 'incremental_evaluations', 'crossover_calls', 'crossover_failures',
+            'crossover_repairs', 'random_fallbacks', 'mutations_applied', 'parent_retries',
+            'memetic_improvements', 'duplicates_replaced', 'replacements')
+
+# Prefix of the entries written from BaseGeneticAlgorithm.checkpoint_state
+STATE_PREFIX = 'state_'
+
+
+def save_checkpoint(ga, path, generation, stagnation, elapsed):
+    """
+    Writes the state of a GA run to path (.npz), atomically
+
+    The population is stored as packed integer genomes (see ArrayEngine.pack_population)
+    together with its fitness, the best solution, the fitness history, the generation
+    counter, the full state of the random and numpy.random generators and the
+    algorithm-specific state (see BaseGeneticAlgorithm.checkpoint_state).
+    """
+    members, team_sizes = ga.engine.pack_population(ga.population)
+    best_members, best_sizes = ga.engine.pack_population([ga.best_solution])
+    # Position of the best solution in the population, -1 if it is not part of it
+    best_index = next((i for i, ind in enumerate(ga.population) if ind is ga.best_solution), -1)
+
+    version, mt_state, gauss_next = random.getstate()
+    np_name, np_keys, np_pos, np_has_gauss, np_gauss = np.random.get_state()
+    extra = {STATE_PREFIX + name: value for name, value in ga.checkpoint_state().items()}
+
+    state = {
+        'members': members,
+        'team_sizes': team_sizes,
+        'population_fitness': np.asarray(ga.population_fitness, dtype=np.float64),
+        'best_members': best_members[0],
+        'best_sizes': best_sizes[0],
+        'best_index': np.int64(best_index),
+        'best_fitness': np.float64(ga.best_fitness),
+        'fitness_history': np.asarray(ga.fitness_history, dtype=np.float64),
+        'generation': np.int64(generation),
+        'stagnation': np.int64(stagnation),
+        'elapsed': np.float64(elapsed),
+        'stop_reason': np.array(ga.stop_reason or ''),
+        'player_ids': np.array([player.id for player in ga.players], dtype=np.int64),
+        'counters': np.array([getattr(ga, name) for name in COUNTERS], dtype=np.int64),
+        'random_version': np.int64(version),
+        'random_state': np.array(mt_state, dtype=np.uint32),
+        'random_gauss': np.array([] if gauss_next is None else [gauss_next], dtype=np.float64),
+        'np_random_name': np.array(np_name),
+        'np_random_keys': np_keys,
+        'np_random_pos': np.int64(np_pos),
+        'np_random_gauss': np.array([np_has_gauss, np_gauss], dtype=np.float64),
+        **extra,
+    }
+
+    # Write next to the target and rename, so a crash never leaves a truncated checkpoint
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **state)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """Reads a checkpoint written by save_checkpoint into a dict of arrays"""
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def restore_checkpoint(ga, state):
+    """
+    Restores the population, best solution, history, counters and RNG states of a checkpoint into ga
+
+    Returns (generation, stagnation, elapsed) to continue the run from.
+    """
+    ga.population = ga.engine.unpack_population(state['members'], state['team_sizes'])
+    ga.population_fitness = state['population_fitness'].tolist()
+    # Evaluated leagues carry their aggregates and fitness, as in an uninterrupted run
+    for league, fit in zip(ga.population, ga.population_fitness):
+        league.get_stats().value = fit
+
+    best_index = int(state['best_index'])
+    if best_index >= 0:
+        ga.best_solution = ga.population[best_index]
+    else:
+        ga.best_solution = ga.engine.unpack_population(state['best_members'][np.newaxis],
+                                                       state['best_sizes'][np.newaxis])[0]
+        ga.best_solution.get_stats().value = float(state['best_fitness'])
+    ga.best_fitness = float(state['best_fitness'])
+    ga.fitness_history = state['fitness_history'].tolist()
+
+    for name, value in zip(COUNTERS, state['counters'].tolist()):
+        setattr(ga, name, value)
+    ga.restore_state({name[len(STATE_PREFIX):]: value for name, value in state.items()
+                      if name.startswith(STATE_PREFIX)})
+
+    gauss = state['random_gauss'].tolist()
+    random.setstate((int(state['random_version']), tuple(state['random_state'].tolist()),
+                     gauss[0] if gauss else None))
+    np_has_gauss, np_gauss = state['np_random_gauss'].tolist()
+    np.random.set_state((str(state['np_random_name']), state['np_random_keys'],
+                         int(state['np_random_pos']), int(np_has_gauss), np_gauss))
+
+    return int(state['generation']), int(state['stagnation']), float(state['elapsed'])
@@ -1,13 +1,69 @@
 import random
 
-from League import League 
-
-NUM_TEAMS = 5
+from League import League, LeagueStats
 
 
 class CrossoverMethods:
     """Class containing different crossover methods for the genetic algorithm"""
     
+    @staticmethod
+    def inherit_team_stats(child, sources):
+        """
+        Assembles the child's cached aggregates from the parents' per-team aggregates,
+        sources[i] being the parent team i was taken from
+        """
+        if all(parent.stats is not None for parent in sources):
+            child.stats = LeagueStats([parent.stats.skill_sums[i] for i, parent in enumerate(sources)],
+                                      [parent.stats.salary_sums[i] for i, parent in enumerate(sources)],
+                                      [parent.stats.pos_counts[i] for i, parent in enumerate(sources)],
+                                      sources[0].stats.problem)
+    
+    @staticmethod
+    def repair(child, reference):
+        """
+        Repairs a child in place so that every player of reference is assigned exactly once
+        
+        Within each position group, duplicated players are replaced by the players of the
+        same position that are missing from the child. Teams are scanned in random order,
+        so which copy of a duplicated player is kept is random as well.
+        Only the teams that are modified are copied (see League.mutable_team).
+        Returns the number of players that were replaced.
+        """
+        # Players of the reference league, by position
+        missing = {}
+        for team in reference.teams:
+            for player in team.players:
+                missing.setdefault(player.position, {})[player.id] = player
+        
+        # Find duplicated slots (team index, player) and remove the assigned players from missing
+        duplicates = []
+        seen = set()
+        team_order = list(range(len(child.teams)))
+        random.shuffle(team_order)
+        for i in team_order:
+            for player in child.teams[i].players:
+                if player.id in seen:
+                    duplicates.append((i, player))
+                else:
+                    seen.add(player.id)
+                    missing.get(player.position, {}).pop(player.id, None)
+        
+        # Replace every duplicate by a missing player of the same position
+        for pos in missing:
+            missing[pos] = list(missing[pos].values())
+            random.shuffle(missing[pos])
+        for i, player in duplicates:
+            team = child.mutable_team(i)
+            if missing.get(player.position):
+                team.replace_player(player, missing[player.position].pop())
+            else:
+                # Nothing left to swap in: drop the duplicate
+                team.remove_player(player)
+        
+        child.stats = None
+        child.repairs = len(duplicates)
+        return child.repairs
+    
     @staticmethod
     def team_based_crossover(parent1, parent2, player_count):
         """
@@ -17,18 +73,23 @@ class CrossoverMethods:
         1. For each team position, randomly selects the team from either parent1 or parent2
         2. Checks if the resulting league is valid (no duplicate players)
         """
-        child = League()
+        problem = parent1.problem
+        teams = []
+        # Parent each team was taken from
+        sources = []
         
         # For each team position, randomly choose the team from either parent1 or parent2
-        for i in range(NUM_TEAMS):
+        # The chosen Team objects are shared with the parent, not copied
+        for i in range(problem.num_teams):
             if random.random() < 0.5:
                 # Take team from parent1
-                for player in parent1.teams[i].players:
-                    child.teams[i].add_player(player)
+                teams.append(parent1.teams[i])
+                sources.append(parent1)
             else:
                 # Take team from parent2
-                for player in parent2.teams[i].players:
-                    child.teams[i].add_player(player)
+                teams.append(parent2.teams[i])
+                sources.append(parent2)
+        child = League.from_teams(teams, problem)
         
         # Check if child is valid (no duplicate players, etc.)
         player_ids = set()
@@ -43,6 +104,8 @@ class CrossoverMethods:
         if len(player_ids) != player_count:
             return None
         
+        CrossoverMethods.inherit_team_stats(child, sources)
+        
         return child
     
     @staticmethod
@@ -54,13 +117,13 @@ class CrossoverMethods:
         1. Randomly selects which parent to take players from for each position type
         2. For example, might take GKs from parent1, DEFs from parent2, etc.
         """
-        child = League()
+        child = League(parent1.problem)
         
         # Track assigned players to avoid duplicates
         assigned_players = set()
         
         # For each position type, choose which parent to take players from
-        for position in ['GK', 'DEF', 'MID', 'FWD']:
+        for position in parent1.problem.positions:
             # Randomly select parent for this position
             source_parent = parent1 if random.random() < 0.5 else parent2
             
@@ -89,4 +152,51 @@ class CrossoverMethods:
             return None
         
         return child
-
+    
+    @staticmethod
+    def team_based_crossover_repair(parent1, parent2, player_count):
+        """
+        Create offspring using team-based crossover, repairing duplicates instead of rejecting the child
+        
+        This crossover:
+        1. For each team position, randomly selects the team from either parent1 or parent2
+        2. Replaces duplicated players with the missing players of the same position
+        """
+        problem = parent1.problem
+        teams = []
+        # Parent each team was taken from
+        sources = []
+        for i in range(problem.num_teams):
+            source = parent1 if random.random() < 0.5 else parent2
+            teams.append(source.teams[i])
+            sources.append(source)
+        child = League.from_teams(teams, problem)
+        
+        if CrossoverMethods.repair(child, parent1) == 0:
+            CrossoverMethods.inherit_team_stats(child, sources)
+        
+        return child
+    
+    @staticmethod
+    def position_based_crossover_repair(parent1, parent2, player_count):
+        """
+        Create offspring using position-based crossover at the level of single teams,
+        repairing duplicates instead of rejecting the child
+        
+        This crossover:
+        1. For each team and each position type, randomly selects the parent to take players from
+        2. Replaces duplicated players with the missing players of the same position
+        """
+        problem = parent1.problem
+        child = League(problem)
+        
+        for i in range(problem.num_teams):
+            for position in problem.positions:
+                source_parent = parent1 if random.random() < 0.5 else parent2
+                for player in source_parent.teams[i].players:
+                    if player.position == position:
+                        child.teams[i].add_player(player)
+        
+        CrossoverMethods.repair(child, parent1)
+        
+        return child
@@ -0,0 +1,124 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import GeneticAlgorithm
+
+
+# Players of the current worker process, set once by the pool initializer
+_worker_players = None
+
+
+def init_worker(players):
+    """Pool initializer: hands the player pool to a worker process once"""
+    global _worker_players
+    _worker_players = players
+
+
+def worker_players():
+    """Players handed to the current worker process by init_worker"""
+    return _worker_players
+
+
+def run_cell(cls_name, seed, ga_kwargs):
+    """Runs one (config, seed) cell with its own seeded RNG state and silenced output"""
+    random.seed(seed)
+    np.random.seed(seed)
+    ga = getattr(GeneticAlgorithm, cls_name)(_worker_players, verbose=False, **ga_kwargs)
+    start_time = time.perf_counter()
+    _, fitness_history = ga.run()
+    wall_time = time.perf_counter() - start_time
+    return cls_name, seed, ga.best_fitness, wall_time, ga.evaluations, fitness_history
+
+
+def load_results(path):
+    """
+    Loads a results file written by ExperimentRunner
+
+    Returns a dict of columns (config, seed, best_fitness, wall_time, evaluations)
+    plus 'fitness_history', a list with the fitness history of every row.
+    """
+    with np.load(path) as data:
+        results = {name: data[name] for name in ExperimentRunner.COLUMNS}
+        offsets, values = data['history_offsets'], data['history_values']
+    results['fitness_history'] = [values[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+    return results
+
+
+class ExperimentRunner:
+    """
+    Runs every GeneticAlgorithm_* class of a grid for a list of seeds in a process pool
+
+    Each finished run is appended to a columnar .npz results file, which is
+    rewritten atomically so that an interrupted sweep can be resumed: cells
+    already present in the file are skipped.
+    """
+    COLUMNS = ('config', 'seed', 'best_fitness', 'wall_time', 'evaluations')
+
+    def __init__(self, players, seeds, results_path, configs=None, processes=None, **ga_kwargs):
+        self.players = players
+        # Defaults to the full selection x crossover x mutation grid
+        configs = GeneticAlgorithm.ALGORITHMS if configs is None else configs
+        self.configs = [cls if isinstance(cls, str) else cls.__name__ for cls in configs]
+        self.seeds = list(seeds)
+        self.results_path = results_path
+        self.processes = processes or os.cpu_count() or 1
+        # Hyperparameters passed to every algorithm, e.g. pop_size and generations
+        self.ga_kwargs = ga_kwargs
+        self.rows = []
+
+    def _load(self):
+        if not os.path.exists(self.results_path):
+            return []
+        results = load_results(self.results_path)
+        return [(str(results['config'][i]), int(results['seed'][i]), float(results['best_fitness'][i]),
+                 float(results['wall_time'][i]), int(results['evaluations'][i]),
+                 results['fitness_history'][i].tolist())
+                for i in range(len(results['seed']))]
+
+    def _save(self):
+        histories = [row[5] for row in self.rows]
+        offsets = np.zeros(len(histories) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(history) for history in histories])
+        columns = {
+            'config': np.array([row[0] for row in self.rows], dtype=str),
+            'seed': np.array([row[1] for row in self.rows], dtype=np.int64),
+            'best_fitness': np.array([row[2] for row in self.rows], dtype=np.float64),
+            'wall_time': np.array([row[3] for row in self.rows], dtype=np.float64),
+            'evaluations': np.array([row[4] for row in self.rows], dtype=np.int64),
+            'history_offsets': offsets,
+            'history_values': np.array([f for history in histories for f in history], dtype=np.float64),
+        }
+        # Write to a temporary file first so an interruption never leaves a truncated results file
+        tmp_path = self.results_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **columns)
+        os.replace(tmp_path, self.results_path)
+
+    def pending_cells(self):
+        done = {(row[0], row[1]) for row in self.rows}
+        return [(config, seed) for config in self.configs for seed in self.seeds
+                if (config, seed) not in done]
+
+    def run(self):
+        self.rows = self._load()
+        pending = self.pending_cells()
+        print(f"Running {len(pending)} cells ({len(self.rows)} already completed) "
+              f"on {self.processes} processes...")
+        start_time = time.time()
+
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=init_worker,
+                                 initargs=(self.players,)) as pool:
+            futures = [pool.submit(run_cell, config, seed, self.ga_kwargs) for config, seed in pending]
+            for done, future in enumerate(as_completed(futures), 1):
+                self.rows.append(future.result())
+                self._save()
+                if done % 10 == 0 or done == len(futures):
+                    print(f"{done}/{len(futures)} cells completed (Time: {time.time() - start_time:.2f}s)")
+
+        if not os.path.exists(self.results_path):
+            self._save()
+        return load_results(self.results_path)
@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+
+class FitnessCache:
+    """Bounded LRU cache of fitness values keyed on a canonical league signature"""
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def signature(league):
+        """
+        Canonical, order-insensitive encoding of team membership
+
+        The same partition of players gives the same signature regardless of
+        the order of the teams or of the players inside a team.
+        """
+        return tuple(sorted(tuple(sorted(player.id for player in team.players))
+                            for team in league.teams))
+
+    def get(self, key):
+        """Returns the cached fitness for key (or None) and updates the hit/miss counters"""
+        fit = self.entries.get(key)
+        if fit is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return fit
+
+    def put(self, key, fit):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = fit
+        self.entries.move_to_end(key)
+        # Evict least recently used entries beyond the size bound
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
@@ -1,149 +1,714 @@
+import bisect
+import inspect
+import math
 import random
 import time
-import matplotlib.pyplot as plt
-from League import League
+import numpy as np
+from League import League, LeagueStats
+from Problem import DEFAULT_PROBLEM
+from ArrayEngine import ArrayEngine
+from FitnessCache import FitnessCache
+from Checkpoint import save_checkpoint, load_checkpoint, restore_checkpoint
 from CrossoverMethods import CrossoverMethods
-from SelectionMethods import SelectionMethods
+from SelectionMethods import RouletteWheelSampler, SelectionMethods, TournamentSampler
 from MutationMethods import MutationMethods
-import matplotlib.pyplot as plt
-
-BUDGET_LIMIT = 750
+from Neighbourhood import Neighbourhood
+from WarmStart import (assignment_from_csv, assignments_from_checkpoint, assignments_from_leagues,
+                       repair_assignment)
 
 class BaseGeneticAlgorithm:
     """Generic GA template; subclasses define selection, crossover, mutation."""
-    NUM_TEAMS = 5
+    # Optional batched selection (population, fitnesses, n_parents) -> list of parents
+    batch_selection = None
+    # Optional selection over a population changed one slot at a time (fitnesses) -> sampler
+    # with update(slot, fitness) and sample(n) -> slots, used by the steady-state mode
+    steady_selection = None
+
+    PHASES = ('selection', 'crossover', 'mutation', 'evaluation', 'local_search', 'bookkeeping')
+
+    REPLACEMENTS = ('worst', 'worst_parent')
 
-    def __init__(self, players, pop_size=40, generations=100):
+    def __init__(self, players, pop_size=40, generations=100, cache_size=10000, verbose=True,
+                 max_time=None, max_evaluations=None, target_fitness=None, max_stagnation=None,
+                 problem=DEFAULT_PROBLEM, memetic_steps=0, mutation_rate=None, dedup=False,
+                 track_diversity=False, adaptive_mutation=False, diversity_threshold=0.3,
+                 steady_state=False, offspring_per_step=2, replacement='worst'):
+        if replacement not in self.REPLACEMENTS:
+            raise ValueError(f"Unknown replacement policy '{replacement}', expected one of {self.REPLACEMENTS}")
+        if steady_state and dedup:
+            raise ValueError("dedup is only supported by the generational mode")
         self.players = players
+        # Team count, formation and budget shared by the model and every operator
+        self.problem = problem
         self.pop_size = pop_size
         self.generations = generations
+        # Optional stopping criteria besides the generation cap: wall-clock seconds,
+        # fitness evaluations, a fitness to reach and generations without improvement
+        self.max_time = max_time
+        self.max_evaluations = max_evaluations
+        self.target_fitness = target_fitness
+        self.max_stagnation = max_stagnation
+        # Memetic mode: number of random swap moves tried on every offspring by a
+        # first-improvement hill climber (see Neighbourhood.hill_climb); 0 disables it
+        self.memetic_steps = memetic_steps
+        # Mutation rate passed to the mutation operator; None keeps the operator's default
+        self.mutation_rate = mutation_rate
+        # Replace offspring identical to an individual already in the new population
+        self.dedup = dedup
+        # Diversity of the population (see ArrayEngine.diversity), recorded every generation
+        # when tracked. With adaptive_mutation, the mutation rate rises linearly from its
+        # base value to 1.0 as the diversity drops from diversity_threshold to 0.
+        self.track_diversity = track_diversity or adaptive_mutation
+        self.adaptive_mutation = adaptive_mutation
+        self.diversity_threshold = diversity_threshold
+        self.diversity = None
+        self.diversity_history = []
+        self.current_mutation_rate = mutation_rate
+        # Steady-state mode: every step breeds offspring_per_step offspring that replace,
+        # when they are better, the worst individual ('worst') or the worse of their
+        # parents ('worst_parent'). A generation is as many steps as needed to breed
+        # pop_size - 1 offspring, like a generational step.
+        self.steady_state = steady_state
+        self.offspring_per_step = offspring_per_step
+        self.replacement = replacement
+        # (fitness, slot) of every individual sorted by fitness, and slot of every league
+        # (by id) in the population; built at the first steady-state step
+        self.ranking = None
+        self.slot_of = None
+        # steady_selection sampler of the population, kept up to date by replace
+        self.sampler = None
+        # Why the last run stopped, see check_termination
+        self.stop_reason = None
         self.population = []
+        self.population_fitness = []
         self.best_solution = None
         self.best_fitness = float('inf')
         self.fitness_history = []
         # Group players by position
-        self.players_by_pos = {
-            'GK': [p for p in players if p.position == 'GK'],
-            'DEF': [p for p in players if p.position == 'DEF'],
-            'MID': [p for p in players if p.position == 'MID'],
-            'FWD': [p for p in players if p.position == 'FWD']
-        }
+        self.players_by_pos = {pos: [p for p in players if p.position == pos] for pos in problem.positions}
+        # Array-backed engine used to score whole populations in one batched call
+        self.engine = ArrayEngine(players, problem)
+        # Memoized fitness values; cache_size=0 disables caching
+        self.fitness_cache = FitnessCache(cache_size)
+        # Number of fitness values actually computed (cache misses included, hits excluded)
+        self.evaluations = 0
+        # Evaluations served from aggregates updated incrementally from a parent
+        self.incremental_evaluations = 0
+        # Crossover outcomes: calls, rejected children (None) and repaired children
+        self.crossover_calls = 0
+        self.crossover_failures = 0
+        self.crossover_repairs = 0
+        # Other run counters: random individuals used as crossover fallback,
+        # mutations that actually changed the offspring and extra parent draws
+        self.random_fallbacks = 0
+        self.mutations_applied = 0
+        self.parent_retries = 0
+        # Offspring improved by the memetic local search
+        self.memetic_improvements = 0
+        # Duplicated offspring replaced by dedup
+        self.duplicates_replaced = 0
+        # Offspring inserted into the population by the steady-state mode
+        self.replacements = 0
+        # Cumulative time (seconds) spent in every phase of the run
+        self.phase_times = dict.fromkeys(self.PHASES, 0.0)
+        # Callbacks receiving a stats record (see generation_stats) after every generation
+        self.observers = []
+        # Set verbose=False to silence the progress output of run()
+        self.verbose = verbose
 
     def create_random_individual(self):
         """Creates a random team by selecting players from the available pool.
         It ensures that the team has a valid formation and does not exceed the budget limit."""
-        league = League()
-        gks = self.players_by_pos['GK'].copy()
-        defs = self.players_by_pos['DEF'].copy()
-        mids = self.players_by_pos['MID'].copy()
-        fwds = self.players_by_pos['FWD'].copy()
-        random.shuffle(gks); random.shuffle(defs)
-        random.shuffle(mids); random.shuffle(fwds)
-        for i in range(self.NUM_TEAMS):
-            if i < len(gks): league.teams[i].add_player(gks[i])
-            for j in range(2):
-                idx = i*2 + j
-                if idx < len(defs): league.teams[i].add_player(defs[idx])
-                if idx < len(mids): league.teams[i].add_player(mids[idx])
-                if idx < len(fwds): league.teams[i].add_player(fwds[idx])
+        league = League(self.problem)
+        formation = self.problem.formation
+        pools = {}
+        for pos in self.problem.positions:
+            pools[pos] = self.players_by_pos[pos].copy()
+            random.shuffle(pools[pos])
+        # Team i gets the i-th block of formation[pos] players of every shuffled position group
+        for i in range(self.problem.num_teams):
+            for j in range(max(formation.values())):
+                for pos, quota in formation.items():
+                    idx = i*quota + j
+                    if j < quota and idx < len(pools[pos]): league.teams[i].add_player(pools[pos][idx])
         return league
 
     def initialize_population(self):
         self.population = [self.create_random_individual() for _ in range(self.pop_size)]
 
+    def select_parents(self, n_parents):
+        """Selects n_parents individuals from the current population.
+        Uses the batched selection when available, so selection probabilities
+        are built only once per generation. Steady-state steps draw from the
+        sampler updated by replace, without going over the whole population."""
+        if self.ranking is not None and self.sampler is not None:
+            return [self.population[slot] for slot in self.sampler.sample(n_parents)]
+        if self.batch_selection is None:
+            return [self.selection(self.population, self.fitness) for _ in range(n_parents)]
+        return self.batch_selection(self.population, self.population_fitness, n_parents)
+
+    @property
+    def crossover_failure_rate(self):
+        return self.crossover_failures / self.crossover_calls if self.crossover_calls else 0.0
+
+    @property
+    def crossover_repair_rate(self):
+        return self.crossover_repairs / self.crossover_calls if self.crossover_calls else 0.0
+
+    @property
+    def cache_hits(self):
+        return self.fitness_cache.hits
+
+    @property
+    def cache_misses(self):
+        return self.fitness_cache.misses
+
     def fitness(self, league):
+        """Returns the fitness of a league.
+        Leagues carrying cached aggregates (see LeagueStats) are scored incrementally,
+        the others are looked up in the fitness cache first."""
+        if league.stats is not None:
+            return self._stats_fitness(league.stats)
+        key = FitnessCache.signature(league)
+        fit = self.fitness_cache.get(key)
+        if fit is None:
+            fit = self.compute_fitness(league)
+            self.evaluations += 1
+            self._cache_fitness(key, league, fit)
+        return fit
+
+    def compute_fitness(self, league):
         """Calculates the fitness of a league based on the standard deviation of team skills."""
-        for team in league.teams:
-            if not team.has_valid_formation():
-                return 1000.0
-            if team.get_total_salary() > BUDGET_LIMIT:
-                return 500.0 + (team.get_total_salary() - BUDGET_LIMIT)
-        return league.get_skill_std_dev()
-   
-
-    def run(self):
-        print("Starting genetic algorithm...")
+        return league.get_stats().fitness()
+
+    def _stats_fitness(self, stats):
+        if stats.value is None:
+            self.evaluations += 1
+            self.incremental_evaluations += 1
+        return stats.fitness()
+
+    def evaluate_population(self, population):
+        """Calculates the fitness of every league in the population.
+        Leagues with cached aggregates are scored incrementally, cached leagues are
+        looked up, and the remaining ones are scored with one batched call."""
+        fitnesses = [None] * len(population)
+        keys = {}
+        for i, league in enumerate(population):
+            if league.stats is not None:
+                fitnesses[i] = self._stats_fitness(league.stats)
+            else:
+                keys[i] = FitnessCache.signature(league)
+                fitnesses[i] = self.fitness_cache.get(keys[i])
+        missing = [i for i, fit in enumerate(fitnesses) if fit is None]
+        if missing:
+            genomes = self.engine.encode_population([population[i] for i in missing])
+            salary_sums, skill_sums, pos_counts = self.engine.team_aggregates(genomes)
+            batch = self.engine.fitness_from_aggregates(salary_sums, skill_sums, pos_counts).tolist()
+            for j, i in enumerate(missing):
+                fitnesses[i] = batch[j]
+                # Keep the aggregates on the league so its offspring can be scored incrementally
+                stats = LeagueStats(skill_sums[j].tolist(), salary_sums[j].tolist(),
+                                    pos_counts[j].tolist(), self.problem)
+                stats.value = batch[j]
+                population[i].stats = stats
+                self._cache_fitness(keys[i], population[i], batch[j])
+            self.evaluations += len(missing)
+        return fitnesses
+
+    def _cache_fitness(self, key, league, fit):
+        # Penalties are decided by the first failing team, so they depend on team order
+        # whenever failing teams would score differently. Only order-invariant values are cached.
+        if fit >= 500.0:
+            penalties = set()
+            for team in league.teams:
+                if not team.has_valid_formation():
+                    penalties.add(1000.0)
+                elif team.total_salary > self.problem.budget_limit:
+                    penalties.add(500.0 + (team.total_salary - self.problem.budget_limit))
+            if len(penalties) > 1:
+                return
+        self.fitness_cache.put(key, fit)
+
+    def evaluate_current_population(self):
+        """Evaluates the current population and updates the best solution found so far."""
+        start = time.perf_counter()
+        self.population_fitness = self.evaluate_population(self.population)
+        evaluated = time.perf_counter()
+        for ind, fit in zip(self.population, self.population_fitness):
+            # If this individual is the best seen so far, update the best records
+            if fit < self.best_fitness:
+                self.best_fitness = fit
+                self.best_solution = ind
+        self.phase_times['evaluation'] += evaluated - start
+        self.phase_times['bookkeeping'] += time.perf_counter() - evaluated
+
+    def add_observer(self, callback):
+        """Registers a callback called with the stats record of every generation (see generation_stats)."""
+        self.observers.append(callback)
+
+    def checkpoint_state(self):
+        """State of a subclass saved with the checkpoints besides the population, the counters
+        and the RNG states: a dict of name -> numpy array, passed back to restore_state"""
+        return {}
+
+    def restore_state(self, state):
+        pass
+
+    def counters(self):
+        return {
+            'fitness_evaluations': self.evaluations,
+            'incremental_evaluations': self.incremental_evaluations,
+            'cache_hits': self.cache_hits,
+            'crossover_calls': self.crossover_calls,
+            'crossover_none': self.crossover_failures,
+            'crossover_repairs': self.crossover_repairs,
+            'random_fallbacks': self.random_fallbacks,
+            'mutations_applied': self.mutations_applied,
+            'parent_retries': self.parent_retries,
+            'memetic_improvements': self.memetic_improvements,
+            'duplicates_replaced': self.duplicates_replaced,
+            'replacements': self.replacements,
+        }
+
+    def generation_stats(self, generation, elapsed):
+        """Stats record of a generation: best fitness, elapsed time,
+        cumulative phase times and cumulative counters."""
+        return {
+            'generation': generation,
+            'best_fitness': self.best_fitness,
+            'elapsed': elapsed,
+            'phase_times': dict(self.phase_times),
+            'counters': self.counters(),
+            'stop_reason': self.stop_reason,
+            'diversity': self.diversity,
+            'mutation_rate': self.current_mutation_rate,
+        }
+
+    def check_termination(self, elapsed, stagnation):
+        """Returns the reason to stop the run, or None to continue.
+        elapsed is the run time in seconds and stagnation the number of
+        generations since the best fitness last improved."""
+        if self.target_fitness is not None and self.best_fitness <= self.target_fitness:
+            return 'target_fitness'
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return 'max_evaluations'
+        if self.max_time is not None and elapsed >= self.max_time:
+            return 'max_time'
+        if self.max_stagnation is not None and stagnation >= self.max_stagnation:
+            return 'stagnation'
+        return None
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def evolve_generation(self):
+        """Replaces the current population with the next generation and evaluates it."""
+        if self.steady_state:
+            for _ in range(math.ceil((self.pop_size - 1) / self.offspring_per_step)):
+                self.steady_state_step()
+            if self.track_diversity:
+                self.update_diversity()
+            return
+
+        # Time spent in each phase, accumulated locally and added to phase_times at the end
+        selection_time = crossover_time = mutation_time = 0.0
+        start = time.perf_counter()
+
+        # Create a new population starting with the current best individual (elitism)
+        new_pop = [self.best_solution]
+        # Signatures of the individuals of new_pop, to detect duplicates
+        seen = {FitnessCache.signature(self.best_solution)} if self.dedup else None
+
+        # Select all the parents of this generation in one batch
+        n_offspring = self.pop_size - len(new_pop)
+        parents = self.select_parents(2 * n_offspring)
+        selection_time += time.perf_counter() - start
+
+        # Fill the rest of the new population
+        for k in range(n_offspring):
+            t0 = time.perf_counter()
+            parent1, parent2 = parents[2 * k], parents[2 * k + 1]
+
+            # Retry selection if both parents are the same (to maintain diversity)
+            retry = 0
+            while parent1 is parent2 and retry < 5:
+                parent2 = self.select_parents(1)[0]
+                retry += 1
+            self.parent_retries += retry
+            t1 = time.perf_counter()
+
+            # Perform crossover to produce offspring
+            offspring = self.reproduce(parent1, parent2)
+            t2 = time.perf_counter()
+
+            # Apply mutation to the offspring
+            mutated = self.mutate(offspring)
+            if mutated is not offspring:
+                self.mutations_applied += 1
+            if seen is not None:
+                mutated = self.deduplicate(mutated, seen)
+
+            # Add the resulting offspring to the new population
+            new_pop.append(mutated)
+            t3 = time.perf_counter()
+
+            selection_time += t1 - t0
+            crossover_time += t2 - t1
+            mutation_time += t3 - t2
+
+        # Replace the current population with the new one
+        self.population = new_pop
+        self.phase_times['selection'] += selection_time
+        self.phase_times['crossover'] += crossover_time
+        self.phase_times['mutation'] += mutation_time
+
+        # Evaluate the fitness of the new population
+        self.evaluate_current_population()
+
+        if self.memetic_steps:
+            self.improve_offspring()
+        if self.track_diversity:
+            self.update_diversity()
+
+    def reproduce(self, parent1, parent2):
+        """Crossover of two parents; falls back to a random individual when the crossover fails."""
+        offspring = self.crossover(parent1, parent2, len(self.players))
+        self.crossover_calls += 1
+
+        # If crossover fails (e.g., returns None), fall back to a random individual
+        if offspring is None:
+            self.crossover_failures += 1
+            self.random_fallbacks += 1
+            offspring = self.create_random_individual()
+        elif offspring.repairs:
+            self.crossover_repairs += 1
+        return offspring
+
+    def build_ranking(self):
+        """Sets up the steady-state structures for the current population"""
+        self.population_fitness = np.asarray(self.population_fitness, dtype=np.float64)
+        self.ranking = sorted((fit, slot) for slot, fit in enumerate(self.population_fitness.tolist()))
+        self.slot_of = {id(league): slot for slot, league in enumerate(self.population)}
+        if self.steady_selection is not None:
+            self.sampler = self.steady_selection(self.population_fitness)
+
+    def replace(self, slot, league, fit):
+        """Puts league in the population slot, keeping the ranking sorted"""
+        old_fit = float(self.population_fitness[slot])
+        del self.ranking[bisect.bisect_left(self.ranking, (old_fit, slot))]
+        bisect.insort(self.ranking, (fit, slot))
+        # The same League object may fill several slots (e.g. in a seeded population)
+        if self.slot_of.get(id(self.population[slot])) == slot:
+            del self.slot_of[id(self.population[slot])]
+        self.slot_of[id(league)] = slot
+        self.population[slot] = league
+        self.population_fitness[slot] = fit
+        if self.sampler is not None:
+            self.sampler.update(slot, fit)
+        self.replacements += 1
+        if fit < self.best_fitness:
+            self.best_fitness = fit
+            self.best_solution = league
+
+    def steady_state_step(self):
+        """Breeds offspring_per_step offspring and inserts the ones better than the
+        individual they replace (see replacement) into the population in place."""
+        if self.ranking is None:
+            self.build_ranking()
+        start = time.perf_counter()
+        parents = self.select_parents(2 * self.offspring_per_step)
+        t0 = time.perf_counter()
+        offspring = []
+        for k in range(self.offspring_per_step):
+            parent1, parent2 = parents[2 * k], parents[2 * k + 1]
+            retry = 0
+            while parent1 is parent2 and retry < 5:
+                parent2 = self.select_parents(1)[0]
+                retry += 1
+            self.parent_retries += retry
+            parents[2 * k + 1] = parent2
+            offspring.append(self.reproduce(parent1, parent2))
+        t1 = time.perf_counter()
+        for k, child in enumerate(offspring):
+            offspring[k] = self.mutate(child)
+            if offspring[k] is not child:
+                self.mutations_applied += 1
+        t2 = time.perf_counter()
+        fitnesses = self.evaluate_population(offspring)
+        t3 = time.perf_counter()
+        if self.memetic_steps:
+            for k in range(len(offspring)):
+                league, fit, scored = Neighbourhood.hill_climb(offspring[k], fitnesses[k], self.memetic_steps)
+                self.evaluations += scored
+                self.incremental_evaluations += scored
+                if league is not offspring[k]:
+                    self.memetic_improvements += 1
+                    offspring[k], fitnesses[k] = league, fit
+        t4 = time.perf_counter()
+
+        for k, (child, fit) in enumerate(zip(offspring, fitnesses)):
+            slot = self.ranking[-1][1]
+            if self.replacement == 'worst_parent':
+                # The worse of the parents still in the population, the worst individual otherwise
+                slots = [self.slot_of[id(p)] for p in parents[2 * k:2 * k + 2] if id(p) in self.slot_of]
+                if slots:
+                    slot = max(slots, key=lambda s: self.population_fitness[s])
+            if fit < self.population_fitness[slot]:
+                self.replace(slot, child, fit)
+
+        self.phase_times['selection'] += t0 - start
+        self.phase_times['crossover'] += t1 - t0
+        self.phase_times['mutation'] += t2 - t1
+        self.phase_times['evaluation'] += t3 - t2
+        self.phase_times['local_search'] += t4 - t3
+        self.phase_times['bookkeeping'] += time.perf_counter() - t4
+
+    def mutate(self, league, mutation_rate=None):
+        """Applies the mutation operator with the given rate, by default the current (adaptive) rate"""
+        if mutation_rate is None:
+            mutation_rate = self.current_mutation_rate
+        if mutation_rate is None:
+            return self.mutation(league)
+        return self.mutation(league, mutation_rate=mutation_rate)
+
+    def deduplicate(self, league, seen, attempts=3):
+        """Returns league, or a replacement when an identical league is already in seen:
+        the league is mutated with rate 1.0 up to attempts times, then replaced by a
+        random individual. Adds the signature of the returned league to seen."""
+        key = FitnessCache.signature(league)
+        if key in seen:
+            self.duplicates_replaced += 1
+            for _ in range(attempts):
+                league = self.mutate(league, 1.0)
+                key = FitnessCache.signature(league)
+                if key not in seen:
+                    break
+            else:
+                league = self.create_random_individual()
+                key = FitnessCache.signature(league)
+        seen.add(key)
+        return league
+
+    @property
+    def base_mutation_rate(self):
+        if self.mutation_rate is not None:
+            return self.mutation_rate
+        return inspect.signature(self.mutation).parameters['mutation_rate'].default
+
+    def update_diversity(self):
+        """Measures the diversity of the current population and, with adaptive_mutation,
+        sets the mutation rate of the next generation."""
+        start = time.perf_counter()
+        self.diversity = ArrayEngine.diversity(self.engine.encode_population(self.population))
+        self.diversity_history.append(self.diversity)
+        if self.adaptive_mutation:
+            base = self.base_mutation_rate
+            shortfall = max(0.0, 1.0 - self.diversity / self.diversity_threshold)
+            self.current_mutation_rate = base + (1.0 - base) * shortfall
+        self.phase_times['bookkeeping'] += time.perf_counter() - start
+
+    def improve_offspring(self):
+        """Memetic step: hill-climbs every offspring of the current population
+        (the elite excluded) and updates the best solution."""
+        start = time.perf_counter()
+        for i in range(1, len(self.population)):
+            league, fit, scored = Neighbourhood.hill_climb(self.population[i], self.population_fitness[i],
+                                                            self.memetic_steps)
+            self.evaluations += scored
+            self.incremental_evaluations += scored
+            if league is not self.population[i]:
+                self.memetic_improvements += 1
+                self.population[i] = league
+                self.population_fitness[i] = fit
+                if fit < self.best_fitness:
+                    self.best_fitness = fit
+                    self.best_solution = league
+        self.phase_times['local_search'] += time.perf_counter() - start
+
+    def generation_record(self, generation, elapsed, best_changed):
+        """Lightweight record of a generation yielded by stream(): fitness summary of the
+        population, elapsed time and the best solution, only when it changed"""
+        fitnesses = self.population_fitness
+        return {
+            'generation': generation,
+            'best_fitness': self.best_fitness,
+            'mean_fitness': float(sum(fitnesses) / len(fitnesses)),
+            'worst_fitness': float(max(fitnesses)),
+            'elapsed': elapsed,
+            'best_solution': self.best_solution if best_changed else None,
+            'stop_reason': self.stop_reason,
+        }
+
+    def run(self, checkpoint_path=None, checkpoint_interval=10, initial_population=None):
+        """Runs the genetic algorithm and returns (best_solution, fitness_history).
+        With checkpoint_path, the run state is saved every checkpoint_interval
+        generations so that it can be continued with resume().
+        initial_population replaces the random initial population (see warm_start)."""
+        for _ in self.stream(checkpoint_path, checkpoint_interval, initial_population, keep_history=True):
+            pass
+        return self.best_solution, self.fitness_history
+
+    def stream(self, checkpoint_path=None, checkpoint_interval=10, initial_population=None,
+               keep_history=False):
+        """
+        Runs the genetic algorithm as a generator of per-generation records (see
+        generation_record), starting with the initial population (generation 0)
+
+        Breaking out of the loop stops the run (stop_reason 'cancelled'); the best
+        solution so far stays available in best_solution. fitness_history is only
+        filled with keep_history=True, so that a long run streamed to a sink uses
+        constant memory. Arguments are those of run().
+        """
+        self.log("Starting genetic algorithm...")
         
         # Record the start time to measure elapsed execution time later
         start_time = time.time()
         
         # Initialize the population with random individuals
-        print("Initializing population...")
-        self.initialize_population()
+        self.log("Initializing population...")
+        self.ranking = None
+        if initial_population is None:
+            self.initialize_population()
+        else:
+            self.population = list(initial_population)
         
         # Evaluate the fitness of the initial population
-        for ind in self.population:
-            fit = self.fitness(ind)
-            # If this individual is the best seen so far, update the best records
-            if fit < self.best_fitness:
-                self.best_fitness = fit
-                self.best_solution = ind
+        self.evaluate_current_population()
 
-        # Store the best fitness of the initial population
-        self.fitness_history.append(self.best_fitness)
-        print(f"Initial best fitness: {self.best_fitness:.4f}")
-
-        # Begin the evolution process across a fixed number of generations
-        for gen in range(self.generations):
-            # Create a new population starting with the current best individual (elitism)
-            new_pop = [self.best_solution]
-
-            # Fill the rest of the new population
-            while len(new_pop) < self.pop_size:
-                # Select two parents using the selection method
-                parent1 = self.selection(self.population, self.fitness)
-                parent2 = self.selection(self.population, self.fitness)
-                
-                # Retry selection if both parents are the same (to maintain diversity)
-                retry = 0
-                while parent1 is parent2 and retry < 5:
-                    parent2 = self.selection(self.population, self.fitness)
-                    retry += 1
-
-                # Perform crossover to produce offspring
-                offspring = self.crossover(parent1, parent2, len(self.players))
-
-                # If crossover fails (e.g., returns None), fall back to a random individual
-                if offspring is None:
-                    offspring = self.create_random_individual()
-
-                # Apply mutation to the offspring
-                offspring = self.mutation(offspring)
-
-                # Add the resulting offspring to the new population
-                new_pop.append(offspring)
-
-            # Replace the current population with the new one
-            self.population = new_pop
-
-            # Evaluate the fitness of the new population
-            for ind in self.population:
-                fit = self.fitness(ind)
-                # Update best fitness and solution if a better one is found
-                if fit < self.best_fitness:
-                    self.best_fitness = fit
-                    self.best_solution = ind
+        if self.track_diversity:
+            self.update_diversity()
 
-            # Log the best fitness of the current generation
+        # Store the best fitness of the initial population
+        if keep_history:
             self.fitness_history.append(self.best_fitness)
+        self.log(f"Initial best fitness: {self.best_fitness:.4f}")
 
-            # Every 10 generations (or final generation), print progress and time
-            if gen % 10 == 0 or gen == self.generations - 1:
-                elapsed = time.time() - start_time
-                print(f"Generation {gen}: Best fitness = {self.best_fitness:.4f} (Time: {elapsed:.2f}s)")
+        elapsed = time.time() - start_time
+        self.stop_reason = self.check_termination(elapsed, 0)
+        yield from self._evolve(0, 0, start_time, checkpoint_path, checkpoint_interval, keep_history,
+                                first_record=self.generation_record(0, elapsed, True))
+
+    def seed_population(self, source, random_fraction=0.5):
+        """
+        Initial population built from an earlier solution, repaired against the current players
+
+        source is a list of Leagues (e.g. the best solution or the final population of an
+        earlier run), a checkpoint (.npz path or dict returned by load_checkpoint) or an
+        exported solution (.csv path, see WarmStart.save_league_csv). The previous
+        solutions are repaired (see WarmStart.repair_assignment), best first, to fill up
+        to (1 - random_fraction) of the population, cycling through them with a full-rate
+        mutation when there are fewer of them; random individuals fill the rest.
+        """
+        if isinstance(source, str) and source.endswith('.csv'):
+            assignments = [assignment_from_csv(source)]
+        elif isinstance(source, (str, dict)):
+            assignments = assignments_from_checkpoint(source, self.players)
+        else:
+            assignments = assignments_from_leagues(source)
 
-        # Print summary once the algorithm completes
-        print(f"Evolution completed in {time.time() - start_time:.2f} seconds")
-        print(f"Final best fitness: {self.best_fitness:.4f}")
+        n_seeded = max(1, round(self.pop_size * (1 - random_fraction)))
+        population = [repair_assignment(assignment, self.players, self.problem)
+                      for assignment in assignments[:n_seeded]]
+        seeds = len(population)
+        while len(population) < n_seeded:
+            population.append(self.mutate(population[len(population) % seeds], 1.0))
+        while len(population) < self.pop_size:
+            population.append(self.create_random_individual())
+        return population
 
-        # Return the best solution and fitness progression over time
+    def warm_start(self, source, random_fraction=0.5, checkpoint_path=None, checkpoint_interval=10):
+        """Runs the genetic algorithm from a population seeded with earlier solutions
+        (see seed_population) instead of a random one. Returns (best_solution, fitness_history)."""
+        self.log("Seeding population from earlier solutions...")
+        return self.run(checkpoint_path, checkpoint_interval,
+                        initial_population=self.seed_population(source, random_fraction))
+
+    def resume(self, checkpoint, checkpoint_path=None, checkpoint_interval=10):
+        """Continues a run from a checkpoint (path or dict returned by load_checkpoint).
+        The continuation is identical to the uninterrupted run, except for the fitness
+        cache, which is not saved: cache_hits and evaluations may differ."""
+        if isinstance(checkpoint, str):
+            checkpoint = load_checkpoint(checkpoint)
+        generation, stagnation, elapsed = restore_checkpoint(self, checkpoint)
+        self.ranking = None
+        if self.track_diversity:
+            self.update_diversity()
+        self.stop_reason = str(checkpoint['stop_reason']) or None
+        self.log(f"Resuming genetic algorithm at generation {generation} "
+                 f"(best fitness {self.best_fitness:.4f})...")
+        for _ in self._evolve(generation, stagnation, time.time() - elapsed,
+                              checkpoint_path, checkpoint_interval, keep_history=True):
+            pass
         return self.best_solution, self.fitness_history
 
+    def _evolve(self, first_gen, stagnation, start_time, checkpoint_path, checkpoint_interval,
+                keep_history, first_record=None):
+        """Generator evolving the population from generation first_gen, yielding
+        first_record (if any) and then the record of every generation (see stream)"""
+        best_solution = self.best_solution
+        try:
+            if first_record is not None:
+                yield first_record
+            # Begin the evolution process across at most self.generations generations
+            for gen in range(first_gen, self.generations):
+                if self.stop_reason is not None:
+                    break
+                previous_best = self.best_fitness
+                self.evolve_generation()
+                bookkeeping_start = time.perf_counter()
+
+                # Log the best fitness of the current generation
+                if keep_history:
+                    self.fitness_history.append(self.best_fitness)
+
+                # Check the stopping criteria
+                stagnation = stagnation + 1 if self.best_fitness >= previous_best else 0
+                elapsed = time.time() - start_time
+                self.stop_reason = self.check_termination(elapsed, stagnation)
+                if self.stop_reason is None and gen == self.generations - 1:
+                    self.stop_reason = 'generations'
+
+                # Every 10 generations (or final generation), print progress and time
+                if gen % 10 == 0 or self.stop_reason is not None:
+                    self.log(f"Generation {gen}: Best fitness = {self.best_fitness:.4f} (Time: {elapsed:.2f}s)")
+
+                if checkpoint_path is not None and (gen + 1) % checkpoint_interval == 0:
+                    save_checkpoint(self, checkpoint_path, gen + 1, stagnation, elapsed)
+
+                if self.observers:
+                    record = self.generation_stats(gen, elapsed)
+                    for callback in self.observers:
+                        callback(record)
+                self.phase_times['bookkeeping'] += time.perf_counter() - bookkeeping_start
+
+                yield self.generation_record(gen + 1, elapsed, self.best_solution is not best_solution)
+                best_solution = self.best_solution
+
+            if self.stop_reason is None:
+                self.stop_reason = 'generations'
+        except GeneratorExit:
+            # The caller stopped consuming the records
+            if self.stop_reason is None:
+                self.stop_reason = 'cancelled'
+            raise
+        finally:
+            # Print summary once the algorithm completes
+            self.log(f"Evolution completed in {time.time() - start_time:.2f} seconds (stopped by {self.stop_reason})")
+            self.log(f"Final best fitness: {self.best_fitness:.4f}")
+
     def get_fitness_history(self):
         return self.fitness_history
 
     # Plot the fitness history over generations
-    def plot_fitness_history(self):
+    def plot_fitness_history(self, path=None):
+        """Shows the plot, or saves it to path without opening a window (see Reports for batches)"""
+        if path is not None:
+            from Reports import render_fitness_history
+            render_fitness_history(self.fitness_history, path)
+            return
+        # Imported here so that importing the optimizers never loads matplotlib
+        import matplotlib.pyplot as plt
         plt.figure(figsize=(10,6))
         plt.plot(self.fitness_history)
         plt.xlabel('Generation')
@@ -152,16 +717,27 @@ class BaseGeneticAlgorithm:
         plt.grid(True)
         plt.show()
 
-# Define subclasses for all combinations
-_selections = {
+# Define subclasses for all combinations. The operator tables are public so that other
+# tools (e.g. Benchmarks) cover every operator the GA can be built with
+SELECTIONS = {
     'tournament': SelectionMethods.tournament_selection,
     'roulette_wheel': SelectionMethods.roulette_wheel_selection
 }
-_crossovers = {
+BATCH_SELECTIONS = {
+    'tournament': SelectionMethods.tournament_selection_batch,
+    'roulette_wheel': SelectionMethods.roulette_wheel_selection_batch
+}
+STEADY_SELECTIONS = {
+    'tournament': TournamentSampler,
+    'roulette_wheel': RouletteWheelSampler
+}
+CROSSOVERS = {
     'team': CrossoverMethods.team_based_crossover,
-    'positionbased': CrossoverMethods.position_based_crossover
+    'positionbased': CrossoverMethods.position_based_crossover,
+    'teamrepair': CrossoverMethods.team_based_crossover_repair,
+    'positionbasedrepair': CrossoverMethods.position_based_crossover_repair
 }
-_mutations = {
+MUTATIONS = {
     'swap': MutationMethods.swap_mutation,
     'positionshuffle': MutationMethods.position_shuffle_mutation,
     'scramble': MutationMethods.scramble_mutation
@@ -169,15 +745,19 @@ _mutations = {
 
 #Generate subclasses for all combinations of selection, crossover, and mutation methods. 
 #This is done to create a unique class for each combination, allowing for easy instantiation and usage of different genetic algorithm configurations.
-for sel_name, sel_fn in _selections.items():
-    for mut_name, mut_fn in _mutations.items():
-        for cross_name, cross_fn in _crossovers.items():
+#The generated classes are also collected by name in ALGORITHMS.
+ALGORITHMS = {}
+for sel_name, sel_fn in SELECTIONS.items():
+    for mut_name, mut_fn in MUTATIONS.items():
+        for cross_name, cross_fn in CROSSOVERS.items():
             cls_name = f"GeneticAlgorithm_{sel_name}_{mut_name}_{cross_name}"
-            globals()[cls_name] = type(
+            globals()[cls_name] = ALGORITHMS[cls_name] = type(
                 cls_name,
                 (BaseGeneticAlgorithm,),
                 {
                     'selection': staticmethod(sel_fn),
+                    'batch_selection': staticmethod(BATCH_SELECTIONS[sel_name]),
+                    'steady_selection': STEADY_SELECTIONS[sel_name],
                     'crossover': staticmethod(cross_fn),
                     'mutation': staticmethod(mut_fn)
                 }
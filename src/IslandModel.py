@@ -0,0 +1,144 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import GeneticAlgorithm
+from ArrayEngine import ArrayEngine
+from ExperimentRunner import init_worker, worker_players
+from Problem import DEFAULT_PROBLEM
+
+
+def _run_island_epoch(cls_name, genomes, n_generations, ga_kwargs, seed):
+    """
+    Runs one island for n_generations inside a worker process
+
+    The population travels in and out of the worker as a genome matrix;
+    genomes=None starts the island from a random population.
+    Returns (genomes, fitnesses, fitness_history).
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+
+    cls = getattr(GeneticAlgorithm, cls_name)
+    ga = cls(worker_players(), generations=n_generations, **ga_kwargs)
+    if genomes is None:
+        ga.initialize_population()
+    else:
+        ga.population = ga.engine.decode_population(genomes)
+    ga.evaluate_current_population()
+
+    history = []
+    for _ in range(n_generations):
+        ga.evolve_generation()
+        history.append(ga.best_fitness)
+
+    return (ga.engine.encode_population(ga.population),
+            np.asarray(ga.population_fitness, dtype=np.float64),
+            history)
+
+
+class IslandModel:
+    """
+    Island-model GA: several sub-populations evolve in parallel in a process pool
+    and exchange their best individuals every migration_interval generations.
+
+    Each island can use a different GeneticAlgorithm_* class. Migrants are sent
+    as genomes (see ArrayEngine) and replace the worst individuals of the
+    receiving island.
+    """
+    TOPOLOGIES = ('ring', 'full')
+
+    def __init__(self, players, island_classes, pop_size=40, generations=100,
+                 migration_interval=10, n_migrants=2, topology='ring',
+                 processes=None, target_fitness=None, seed=None, problem=DEFAULT_PROBLEM):
+        if topology not in self.TOPOLOGIES:
+            raise ValueError(f"Unknown migration topology '{topology}', expected one of {self.TOPOLOGIES}")
+        self.players = players
+        self.island_classes = [cls if isinstance(cls, str) else cls.__name__ for cls in island_classes]
+        self.pop_size = pop_size
+        self.generations = generations
+        self.migration_interval = migration_interval
+        self.n_migrants = n_migrants
+        self.topology = topology
+        self.processes = processes or min(len(self.island_classes), os.cpu_count() or 1)
+        self.target_fitness = target_fitness
+        self.seed = seed
+        self.problem = problem
+        self.engine = ArrayEngine(players, problem)
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.island_histories = [[] for _ in self.island_classes]
+        self.fitness_history = []
+
+    def neighbours(self, island):
+        """Islands that receive migrants from the given island"""
+        n_islands = len(self.island_classes)
+        if n_islands < 2:
+            return []
+        if self.topology == 'ring':
+            return [(island + 1) % n_islands]
+        return [other for other in range(n_islands) if other != island]
+
+    def migrate(self, genomes, fitnesses):
+        """Copies the best n_migrants of every island over the worst individuals of its neighbours"""
+        # Pick all emigrants before any island is modified
+        emigrants = []
+        for pop_genomes, pop_fitness in zip(genomes, fitnesses):
+            best = np.argsort(pop_fitness, kind='stable')[:self.n_migrants]
+            emigrants.append((pop_genomes[best].copy(), pop_fitness[best].copy()))
+
+        for source, (migrant_genomes, migrant_fitness) in enumerate(emigrants):
+            for target in self.neighbours(source):
+                worst = np.argsort(fitnesses[target], kind='stable')[::-1][:len(migrant_fitness)]
+                genomes[target][worst] = migrant_genomes
+                fitnesses[target][worst] = migrant_fitness
+
+    def run(self):
+        print(f"Starting island model with {len(self.island_classes)} islands on {self.processes} processes...")
+        start_time = time.time()
+        seeds = random.Random(self.seed)
+        n_islands = len(self.island_classes)
+        # Every run starts from new random islands: forget the results of a previous run
+        self.best_solution = None
+        self.best_fitness = float('inf')
+        self.island_histories = [[] for _ in self.island_classes]
+        self.fitness_history = []
+        genomes = [None] * n_islands
+        fitnesses = [None] * n_islands
+        ga_kwargs = {'pop_size': self.pop_size, 'problem': self.problem}
+
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=init_worker,
+                                 initargs=(self.players,)) as pool:
+            n_epochs = math.ceil(self.generations / self.migration_interval)
+            for epoch in range(n_epochs):
+                n_generations = min(self.migration_interval,
+                                    self.generations - epoch * self.migration_interval)
+                futures = [pool.submit(_run_island_epoch, self.island_classes[i], genomes[i],
+                                       n_generations, ga_kwargs, seeds.randrange(2**32))
+                           for i in range(n_islands)]
+
+                for i, future in enumerate(futures):
+                    genomes[i], fitnesses[i], history = future.result()
+                    self.island_histories[i].extend(history)
+                    best = int(np.argmin(fitnesses[i]))
+                    if fitnesses[i][best] < self.best_fitness:
+                        self.best_fitness = float(fitnesses[i][best])
+                        self.best_solution = genomes[i][best].copy()
+
+                self.fitness_history.append(self.best_fitness)
+                elapsed = time.time() - start_time
+                print(f"Epoch {epoch}: Best fitness = {self.best_fitness:.4f} (Time: {elapsed:.2f}s)")
+
+                if self.target_fitness is not None and self.best_fitness <= self.target_fitness:
+                    break
+                self.migrate(genomes, fitnesses)
+
+        print(f"Island model completed in {time.time() - start_time:.2f} seconds")
+        print(f"Final best fitness: {self.best_fitness:.4f}")
+
+        # Return the global best as a League view and the per-island fitness histories
+        return self.engine.decode(self.best_solution), self.island_histories
@@ -0,0 +1,495 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import GeneticAlgorithm
+from LocalSearch import LOCAL_SEARCHES
+from Player import Player
+from PlayerStore import load_player_store
+from Problem import Problem
+from WarmStart import assignments_from_leagues
+
+
+DEFAULT_PORT = 8765
+
+# Algorithms a job can run, by name
+JOB_ALGORITHMS = dict(GeneticAlgorithm.ALGORITHMS, **LOCAL_SEARCHES)
+
+# Job settings forced by the service
+RESERVED_PARAMS = ('players', 'problem', 'verbose')
+
+
+# Progress queue of the current worker process and the player stores it has loaded
+# (path -> (CSV version, store)), set up once by the pool initializer: workers stay alive between jobs, so the modules
+# imported above and the memory-mapped stores are reused by every job they run
+_worker_progress = None
+_worker_stores = {}
+
+
+def _init_worker(progress_queue):
+    global _worker_progress
+    _worker_progress = progress_queue
+
+
+def _ping():
+    return os.getpid()
+
+
+def _job_players(spec):
+    if 'players_path' in spec:
+        path = spec['players_path']
+        # A store is reused only while the CSV is unchanged: a job runs on the roster
+        # found at its path when it starts, not on the one a warm worker loaded before
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if path not in _worker_stores or _worker_stores[path][0] != version:
+            _worker_stores[path] = (version, load_player_store(path))
+        return _worker_stores[path][1]
+    return [Player(*row) for row in spec['players']]
+
+
+def _run_job(job_id, spec, progress_interval):
+    """Runs one job in a worker, sending progress records to the service at most
+    every progress_interval seconds; returns the result payload"""
+    if spec.get('seed') is not None:
+        random.seed(spec['seed'])
+        np.random.seed(spec['seed'])
+    problem = Problem(**spec.get('problem', {}))
+    cls = JOB_ALGORITHMS[spec['algorithm']]
+    ga = cls(_job_players(spec), problem=problem, verbose=False, **spec.get('params', {}))
+
+    start_time = time.perf_counter()
+    last_sent = 0.0
+    generations = 0
+    for record in ga.stream(keep_history=True):
+        generations = record['generation']
+        now = time.perf_counter()
+        if now - last_sent >= progress_interval or record['stop_reason'] is not None:
+            last_sent = now
+            _worker_progress.put((job_id, {key: value for key, value in record.items() if key != 'best_solution'}))
+
+    return {
+        'best_fitness': ga.best_fitness,
+        'stop_reason': ga.stop_reason,
+        'generations': generations,
+        'evaluations': ga.evaluations,
+        'wall_time': time.perf_counter() - start_time,
+        'assignment': assignments_from_leagues([ga.best_solution])[0],
+        'fitness_history': ga.fitness_history,
+    }
+
+
+def job_key(spec):
+    """Identity of a job specification: identical in-flight jobs are run once"""
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def validate_job(spec):
+    """Checks a job specification, raises ValueError when it cannot be run"""
+    if not isinstance(spec, dict):
+        raise ValueError("A job must be a JSON object")
+    if spec.get('algorithm') not in JOB_ALGORITHMS:
+        raise ValueError(f"Unknown algorithm {spec.get('algorithm')!r}")
+    if ('players' in spec) == ('players_path' in spec):
+        raise ValueError("A job needs either 'players' (rows of id, name, position, skill, salary) "
+                         "or 'players_path' (player CSV)")
+    if 'players' in spec and not all(isinstance(row, list) and len(row) == 5 for row in spec['players']):
+        raise ValueError("Every player must be a list [id, name, position, skill, salary]")
+    params = spec.get('params', {})
+    if not isinstance(params, dict) or any(name in params for name in RESERVED_PARAMS):
+        raise ValueError(f"params must be an object without {RESERVED_PARAMS}")
+    try:
+        Problem(**spec.get('problem', {}))
+    except TypeError as e:
+        raise ValueError(f"Invalid problem: {e}") from None
+
+
+class Job:
+    """State of a submitted job, kept by the service"""
+    def __init__(self, job_id, key, spec):
+        self.id = job_id
+        self.key = key
+        self.spec = spec
+        # queued -> running -> done | failed
+        self.state = 'queued'
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.progress = None
+        self.result = None
+        self.error = None
+        # Queues of the clients streaming the progress of the job
+        self.subscribers = []
+        self.done = asyncio.Event()
+
+    def status(self):
+        return {'job_id': self.id, 'state': self.state, 'algorithm': self.spec['algorithm'],
+                'submitted': self.submitted, 'started': self.started, 'finished': self.finished,
+                'progress': self.progress, 'error': self.error}
+
+
+class JobService:
+    """
+    Local optimization service: queues jobs onto a pool of warm worker processes
+
+    A job is a JSON object with the algorithm name (a GeneticAlgorithm_* class or a
+    LOCAL_SEARCHES engine), the players ('players' rows or a 'players_path' CSV), the
+    optional 'problem' settings (Problem arguments), 'params' passed to the algorithm
+    (pop_size, generations, max_time, ...) and an optional 'seed'.
+
+    At most queue_size jobs wait for a worker; submitting beyond that fails, so a
+    client can back off. A job identical to a queued or running one is not run
+    again: the submission returns the id of the running job. Workers are started
+    once, with the modules already imported, and report progress through a
+    multiprocessing queue; the last max_finished finished jobs are kept. When a worker
+    dies the pool breaks: the jobs it was running fail and a new pool is started.
+    """
+    def __init__(self, processes=None, queue_size=100, progress_interval=0.1, max_finished=1000):
+        self.processes = processes or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.progress_interval = progress_interval
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        # Key -> job, for the queued and running jobs
+        self.in_flight = {}
+        self.queue = None
+        self.pool = None
+        self.progress_queue = None
+        self.progress_reader = None
+        self.loop = None
+        self.dispatchers = []
+        self.servers = []
+        self.started = None
+        self.n_jobs = 0
+        # Metrics
+        self.submitted = 0
+        self.deduplicated = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.pool_restarts = 0
+        self.generations_done = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    async def start(self):
+        """Starts the workers (and waits until all of them are up) and the dispatchers"""
+        self.loop = asyncio.get_running_loop()
+        self.started = time.time()
+        self.queue = asyncio.Queue(self.queue_size)
+        self.progress_queue = multiprocessing.Queue()
+        self.pool = self._new_pool()
+        await asyncio.gather(*(self.loop.run_in_executor(self.pool, _ping) for _ in range(self.processes)))
+        self.progress_reader = threading.Thread(target=self._read_progress, daemon=True)
+        self.progress_reader.start()
+        self.dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.processes)]
+
+    async def close(self):
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        # Waits for the running jobs to stop without blocking the event loop
+        await asyncio.to_thread(self.pool.shutdown, cancel_futures=True)
+        # The workers are gone: stop the reader once it has handed over their last records
+        self.progress_queue.put(None)
+        await self.loop.run_in_executor(None, self.progress_reader.join)
+
+    async def serve(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        """Accepts clients on a TCP port, or on a Unix socket when path is given (see JobClient)"""
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle_client, path)
+        else:
+            server = await asyncio.start_server(self._handle_client, host, port)
+        self.servers.append(server)
+        return server
+
+    def submit(self, spec):
+        """Queues a job; returns (job id, True when an identical job was already in flight)"""
+        validate_job(spec)
+        key = job_key(spec)
+        if key in self.in_flight:
+            self.deduplicated += 1
+            return self.in_flight[key].id, True
+        if self.queue.full():
+            self.rejected += 1
+            raise RuntimeError(f"Job queue full ({self.queue_size} jobs waiting)")
+        self.n_jobs += 1
+        job = Job(f"job-{self.n_jobs}-{key[:8]}", key, spec)
+        self.jobs[job.id] = job
+        self.in_flight[key] = job
+        self.queue.put_nowait(job)
+        self.submitted += 1
+        return job.id, False
+
+    def get_job(self, job_id):
+        if job_id not in self.jobs:
+            raise ValueError(f"Unknown job {job_id!r}")
+        return self.jobs[job_id]
+
+    async def result(self, job_id):
+        """Waits until the job is finished; returns its result (raises RuntimeError if it failed)"""
+        job = self.get_job(job_id)
+        await job.done.wait()
+        if job.state == 'failed':
+            raise RuntimeError(job.error)
+        return job.result
+
+    async def progress(self, job_id):
+        """Async iterator over the progress records of a job, from the latest one until it finishes"""
+        job = self.get_job(job_id)
+        if job.done.is_set():
+            if job.progress is not None:
+                yield job.progress
+            return
+        queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        try:
+            if job.progress is not None:
+                yield job.progress
+            while True:
+                record = await queue.get()
+                if record is None:
+                    return
+                yield record
+        finally:
+            job.subscribers.remove(queue)
+
+    def metrics(self):
+        uptime = time.time() - self.started
+        finished = self.completed + self.failed
+        return {
+            'uptime': uptime,
+            'workers': self.processes,
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue_size,
+            'running': sum(job.state == 'running' for job in self.in_flight.values()),
+            'submitted': self.submitted,
+            'deduplicated': self.deduplicated,
+            'rejected': self.rejected,
+            'completed': self.completed,
+            'failed': self.failed,
+            'pool_restarts': self.pool_restarts,
+            'jobs_per_sec': finished / uptime if uptime > 0 else 0.0,
+            'generations_per_sec': self.generations_done / uptime if uptime > 0 else 0.0,
+            'mean_wait_time': self.wait_time / finished if finished else None,
+            'mean_run_time': self.run_time / finished if finished else None,
+        }
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.processes, initializer=_init_worker,
+                                   initargs=(self.progress_queue,))
+
+    def _restart_pool(self, broken_pool):
+        # Every dispatcher whose job ran on the broken pool gets here, the first one replaces it
+        if self.pool is not broken_pool:
+            return
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = self._new_pool()
+        self.pool_restarts += 1
+
+    def _read_progress(self):
+        # Runs in a thread: hands the records sent by the workers over to the event loop
+        while True:
+            item = self.progress_queue.get()
+            if item is None:
+                return
+            self.loop.call_soon_threadsafe(self._on_progress, *item)
+
+    def _on_progress(self, job_id, record):
+        job = self.jobs.get(job_id)
+        if job is None or job.done.is_set():
+            return
+        job.progress = record
+        for queue in job.subscribers:
+            queue.put_nowait(record)
+
+    async def _dispatch(self):
+        while True:
+            job = await self.queue.get()
+            job.state = 'running'
+            job.started = time.time()
+            try:
+                try:
+                    pool = self.pool
+                    future = self.loop.run_in_executor(pool, _run_job, job.id, job.spec, self.progress_interval)
+                except BrokenProcessPool:
+                    # The pool broke before the job reached it: the job runs on a new one
+                    self._restart_pool(pool)
+                    pool = self.pool
+                    future = self.loop.run_in_executor(pool, _run_job, job.id, job.spec, self.progress_interval)
+                job.result = await future
+                job.state = 'done'
+                self.completed += 1
+                self.generations_done += job.result['generations']
+            except asyncio.CancelledError:
+                raise
+            except BrokenProcessPool:
+                job.state = 'failed'
+                job.error = "BrokenProcessPool: a worker process died while the job was running"
+                self.failed += 1
+                self._restart_pool(pool)
+            except Exception as e:
+                job.state = 'failed'
+                job.error = f"{type(e).__name__}: {e}"
+                self.failed += 1
+            job.finished = time.time()
+            self.wait_time += job.started - job.submitted
+            self.run_time += job.finished - job.started
+            del self.in_flight[job.key]
+            job.done.set()
+            for queue in job.subscribers:
+                queue.put_nowait(None)
+            self._forget_finished()
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done.is_set()]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+    async def _handle_client(self, reader, writer):
+        """
+        Line-delimited JSON protocol: every request is one JSON object with an 'op'
+        (submit, status, result, progress, metrics), answered by one JSON line, or by
+        one line per progress record and a final 'done' event for progress
+        """
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    op = request.get('op')
+                    if op == 'progress':
+                        async for record in self.progress(request.get('job_id')):
+                            await self._send(writer, {'event': 'progress', **record})
+                        await self._send(writer, {'event': 'done', **self.get_job(request['job_id']).status()})
+                        continue
+                    response = await self._answer(op, request)
+                except (ValueError, RuntimeError, KeyError) as e:
+                    response = {'ok': False, 'error': str(e)}
+                await self._send(writer, response)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, op, request):
+        if op == 'submit':
+            job_id, deduplicated = self.submit(request.get('job'))
+            return {'ok': True, 'job_id': job_id, 'deduplicated': deduplicated}
+        if op == 'status':
+            return {'ok': True, **self.get_job(request.get('job_id')).status()}
+        if op == 'result':
+            job = self.get_job(request.get('job_id'))
+            if request.get('wait', True):
+                await job.done.wait()
+            return {'ok': job.state != 'failed', **job.status(), 'result': job.result}
+        if op == 'metrics':
+            return {'ok': True, **self.metrics()}
+        raise ValueError(f"Unknown op {op!r}")
+
+    @staticmethod
+    async def _send(writer, message):
+        writer.write(json.dumps(message).encode('utf-8') + b'\n')
+        await writer.drain()
+
+
+class JobClient:
+    """Client of a JobService listening on host:port, or on a Unix socket when path is given"""
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, path=None):
+        self.host = host
+        self.port = port
+        self.path = path
+
+    async def _connect(self):
+        if self.path is not None:
+            return await asyncio.open_unix_connection(self.path)
+        return await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, message):
+        reader, writer = await self._connect()
+        try:
+            writer.write(json.dumps(message).encode('utf-8') + b'\n')
+            await writer.drain()
+            return json.loads(await reader.readline())
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _checked(response):
+        if not response.get('ok'):
+            raise RuntimeError(response.get('error'))
+        return response
+
+    async def submit(self, job):
+        """Returns the id of the submitted job (or of the identical job in flight)"""
+        return self._checked(await self.request({'op': 'submit', 'job': job}))['job_id']
+
+    async def status(self, job_id):
+        return self._checked(await self.request({'op': 'status', 'job_id': job_id}))
+
+    async def result(self, job_id, wait=True):
+        return self._checked(await self.request({'op': 'result', 'job_id': job_id, 'wait': wait}))['result']
+
+    async def metrics(self):
+        return self._checked(await self.request({'op': 'metrics'}))
+
+    async def progress(self, job_id):
+        """Async iterator over the progress records of a job until it finishes"""
+        reader, writer = await self._connect()
+        try:
+            writer.write(json.dumps({'op': 'progress', 'job_id': job_id}).encode('utf-8') + b'\n')
+            await writer.drain()
+            while line := await reader.readline():
+                message = json.loads(line)
+                if message.get('ok') is False:
+                    raise RuntimeError(message.get('error'))
+                if message.get('event') != 'progress':
+                    return
+                yield message
+        finally:
+            writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local optimization job service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help="listen on this Unix socket instead of a TCP port")
+    parser.add_argument('--processes', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--queue-size', type=int, default=100, help="maximum number of waiting jobs")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        service = JobService(args.processes, args.queue_size)
+        await service.start()
+        server = await service.serve(args.host, args.port, args.socket)
+        where = args.socket or f"{args.host}:{args.port}"
+        print(f"Job service listening on {where} with {service.processes} workers")
+        try:
+            await server.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
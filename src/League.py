@@ -1,14 +1,149 @@
+import math
+
 import numpy as np
 
+from Problem import DEFAULT_PROBLEM
 from Team import Team
 
 
-NUM_TEAMS = 5
+class LeagueStats:
+    """
+    Cached per-team aggregates of a league: skill sums, salary sums and position counts
+
+    A league derived from a parent by a few player moves (see League.inherit_stats)
+    updates a copy of the parent's aggregates in O(1) per move instead of re-summing
+    every team, and its fitness is read from the aggregates without touching the players.
+    """
+    def __init__(self, skill_sums, salary_sums, pos_counts, problem=DEFAULT_PROBLEM):
+        self.skill_sums = list(skill_sums)
+        self.salary_sums = list(salary_sums)
+        # One tuple of counts per team, in problem.positions order
+        self.pos_counts = [tuple(counts) for counts in pos_counts]
+        self.problem = problem
+        self.budget_limit = problem.budget_limit
+        # Running totals of the team skill sums and of their squares, for the std-dev
+        self.skill_total = sum(self.skill_sums)
+        self.skill_sq_total = sum(s * s for s in self.skill_sums)
+        # Indices of the teams failing the formation / budget checks
+        self.invalid = {t for t, counts in enumerate(self.pos_counts) if counts != problem.formation_counts}
+        self.over_budget = {t for t, salary in enumerate(self.salary_sums) if salary > problem.budget_limit}
+        # Memoized fitness, reset by apply_move
+        self.value = None
+
+    @classmethod
+    def from_league(cls, league):
+        # Read from the running totals of the teams. Players of positions outside the
+        # formation are not counted (the array engine does not support them either)
+        skill_sums = [team.total_skill for team in league.teams]
+        salary_sums = [team.total_salary for team in league.teams]
+        pos_counts = [team.pos_counts for team in league.teams]
+        return cls(skill_sums, salary_sums, pos_counts, league.problem)
+
+    def copy(self):
+        stats = LeagueStats.__new__(LeagueStats)
+        stats.skill_sums = self.skill_sums.copy()
+        stats.salary_sums = self.salary_sums.copy()
+        stats.pos_counts = self.pos_counts.copy()
+        stats.problem = self.problem
+        stats.budget_limit = self.budget_limit
+        stats.skill_total = self.skill_total
+        stats.skill_sq_total = self.skill_sq_total
+        stats.invalid = self.invalid.copy()
+        stats.over_budget = self.over_budget.copy()
+        stats.value = self.value
+        return stats
+
+    def apply_move(self, team_a, team_b, player_in, player_out):
+        """Updates the aggregates after player_in moved from team_b to team_a
+        and player_out moved from team_a to team_b"""
+        self.value = None
+        skill_delta = player_in.skill - player_out.skill
+        salary_delta = player_in.salary - player_out.salary
+        for team, sign in ((team_a, 1), (team_b, -1)):
+            old_skill = self.skill_sums[team]
+            new_skill = old_skill + sign * skill_delta
+            self.skill_sums[team] = new_skill
+            self.skill_sq_total += new_skill * new_skill - old_skill * old_skill
+
+            self.salary_sums[team] += sign * salary_delta
+            if self.salary_sums[team] > self.budget_limit:
+                self.over_budget.add(team)
+            else:
+                self.over_budget.discard(team)
+
+        # Swaps within a position group leave the formations untouched
+        if player_in.pos_code != player_out.pos_code:
+            pos_in, pos_out = self.problem.position_slot(player_in), self.problem.position_slot(player_out)
+            for team, gained, lost in ((team_a, pos_in, pos_out), (team_b, pos_out, pos_in)):
+                counts = list(self.pos_counts[team])
+                counts[gained] += 1
+                counts[lost] -= 1
+                self.pos_counts[team] = tuple(counts)
+                if self.pos_counts[team] != self.problem.formation_counts:
+                    self.invalid.add(team)
+                else:
+                    self.invalid.discard(team)
+
+    def fitness(self):
+        """Same value as BaseGeneticAlgorithm.fitness for the league these aggregates describe"""
+        if self.value is None:
+            self.value = self._compute_fitness()
+        return self.value
+
+    def _compute_fitness(self):
+        if self.invalid or self.over_budget:
+            # The first failing team (in team order) decides the penalty
+            first = min(self.invalid | self.over_budget)
+            if first in self.invalid:
+                return 1000.0
+            return 500.0 + (self.salary_sums[first] - self.budget_limit)
+
+        # All teams have a valid formation, hence the same size: the std-dev of the
+        # average skills follows from the sum and the sum of squares of the skill totals
+        n_teams = len(self.skill_sums)
+        variance = max(n_teams * self.skill_sq_total - self.skill_total * self.skill_total, 0)
+        return math.sqrt(variance) / (n_teams * self.problem.team_size)
+
 
 class League:
     """Class to represent the entire league (a solution)"""
-    def __init__(self, num_teams=NUM_TEAMS):
-        self.teams = [Team(i) for i in range(num_teams)]
+    __slots__ = ('problem', 'teams', 'stats', 'moves', 'owned', 'repairs')
+
+    def __init__(self, problem=DEFAULT_PROBLEM):
+        self.problem = problem
+        self.teams = [Team(i, problem) for i in range(problem.num_teams)]
+        # Cached LeagueStats, filled when the league is evaluated or derived from an evaluated parent
+        self.stats = None
+        # Player moves that derived this league from its parent: (team_a, team_b, player_in, player_out)
+        self.moves = []
+        # Bit mask of the teams owned by this league (bit i for team i);
+        # the other teams are shared with another league
+        self.owned = (1 << problem.num_teams) - 1
+        # Number of players replaced when the league was repaired by a crossover
+        self.repairs = 0
+
+    @classmethod
+    def from_teams(cls, teams, problem=DEFAULT_PROBLEM):
+        """Creates a league sharing the given Team objects (copy-on-write, see mutable_team)"""
+        league = cls.__new__(cls)
+        league.problem = problem
+        league.teams = list(teams)
+        league.stats = None
+        league.moves = []
+        league.owned = 0
+        league.repairs = 0
+        return league
+
+    def copy(self):
+        """Structural-sharing copy: the teams are shared until one of them is modified"""
+        return League.from_teams(self.teams, self.problem)
+
+    def mutable_team(self, i):
+        """Returns team i for modification, copying it first if it is shared with another league"""
+        if not self.owned >> i & 1:
+            self.teams[i] = self.teams[i].copy()
+            self.owned |= 1 << i
+        return self.teams[i]
     
     def get_avg_skills(self):
         return [team.get_avg_skill() for team in self.teams]
@@ -16,6 +151,23 @@ class League:
     def get_skill_std_dev(self):
         avg_skills = self.get_avg_skills()
         return np.std(avg_skills)
+
+    def get_stats(self):
+        if self.stats is None:
+            self.stats = LeagueStats.from_league(self)
+        return self.stats
+
+    def inherit_stats(self, parent, moves):
+        """
+        Records the moves that derived this league from parent and, when the
+        parent's aggregates are cached, updates a copy of them for this league
+        """
+        self.moves = moves
+        if parent.stats is not None:
+            stats = parent.stats.copy()
+            for move in moves:
+                stats.apply_move(*move)
+            self.stats = stats
     
     def is_valid(self):
         """Check if the league configuration is valid"""
@@ -0,0 +1,204 @@
+import math
+import random
+import time
+
+import numpy as np
+
+from GeneticAlgorithm import BaseGeneticAlgorithm
+from Neighbourhood import Neighbourhood
+from Problem import DEFAULT_PROBLEM
+
+
+class BaseLocalSearch(BaseGeneticAlgorithm):
+    """
+    Single-solution search over the same-position swap neighbourhood (see Neighbourhood)
+
+    Local searches reuse the GA problem interface: the League model, fitness,
+    players_by_pos, the stopping criteria, observers and the run() contract
+    (returns (best_solution, fitness_history)). Every iteration plays the role
+    of a generation; subclasses define step().
+
+    neighbourhood_size: number of random moves scored per iteration by the
+    engines that look at several neighbours; None scores the whole neighbourhood
+    (num_teams * (num_teams - 1) / 2 * sum of squared quotas moves, so set it on
+    large leagues).
+    """
+    def __init__(self, players, iterations=1000, neighbourhood_size=None, verbose=True,
+                 max_time=None, max_evaluations=None, target_fitness=None, max_stagnation=None,
+                 problem=DEFAULT_PROBLEM):
+        # Neighbours are scored from the cached aggregates, the fitness cache is not used
+        super().__init__(players, pop_size=1, generations=iterations, cache_size=0, verbose=verbose,
+                         max_time=max_time, max_evaluations=max_evaluations,
+                         target_fitness=target_fitness, max_stagnation=max_stagnation, problem=problem)
+        self.neighbourhood_size = neighbourhood_size
+        self.iteration = 0
+        # Moves applied to the current solution
+        self.moves_accepted = 0
+
+    @property
+    def current(self):
+        return self.population[0]
+
+    @property
+    def current_fitness(self):
+        return self.population_fitness[0]
+
+    def counters(self):
+        counters = super().counters()
+        counters['moves_accepted'] = self.moves_accepted
+        return counters
+
+    def checkpoint_state(self):
+        return {'iteration': np.int64(self.iteration), 'moves_accepted': np.int64(self.moves_accepted)}
+
+    def restore_state(self, state):
+        self.iteration = int(state['iteration'])
+        self.moves_accepted = int(state['moves_accepted'])
+
+    def score_move(self, move):
+        """Fitness of the current solution after the move"""
+        self.evaluations += 1
+        self.incremental_evaluations += 1
+        return Neighbourhood.move_fitness(self.current.get_stats(), move)
+
+    def best_move(self, moves, admissible=None):
+        """(move, fitness) of the best move among moves, (None, inf) if there is none
+        (or none passes admissible(move, fitness))"""
+        best, best_fit = None, float('inf')
+        for move in moves:
+            fit = self.score_move(move)
+            if fit < best_fit and (admissible is None or admissible(move, fit)):
+                best, best_fit = move, fit
+        return best, best_fit
+
+    def accept(self, move, fit):
+        """Makes the solution obtained by the move the current one"""
+        league = Neighbourhood.apply(self.current, move)
+        league.stats.value = fit
+        self.set_current(league, fit)
+        self.moves_accepted += 1
+
+    def set_current(self, league, fit):
+        self.population = [league]
+        self.population_fitness = [fit]
+        if fit < self.best_fitness:
+            self.best_fitness = fit
+            self.best_solution = league
+
+    def evolve_generation(self):
+        """One iteration of the local search"""
+        start = time.perf_counter()
+        self.step()
+        self.iteration += 1
+        self.phase_times['local_search'] += time.perf_counter() - start
+
+    def step(self):
+        raise NotImplementedError
+
+
+class HillClimbing(BaseLocalSearch):
+    """
+    Steepest-descent hill climbing: moves to the best of the scored neighbours
+    while it improves the fitness. At a local optimum the search restarts from a
+    random league (restarts=True) or stays there until a stopping criterion is met.
+    """
+    def __init__(self, players, restarts=True, **kwargs):
+        super().__init__(players, **kwargs)
+        self.restarts = restarts
+        self.n_restarts = 0
+
+    def counters(self):
+        counters = super().counters()
+        counters['restarts'] = self.n_restarts
+        return counters
+
+    def checkpoint_state(self):
+        return dict(super().checkpoint_state(), restarts=np.int64(self.n_restarts))
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        self.n_restarts = int(state['restarts'])
+
+    def step(self):
+        move, fit = self.best_move(Neighbourhood.sample_moves(self.current, self.neighbourhood_size))
+        if move is not None and fit < self.current_fitness:
+            self.accept(move, fit)
+        elif self.restarts:
+            self.n_restarts += 1
+            self.population = [self.create_random_individual()]
+            self.evaluate_current_population()
+
+
+class SimulatedAnnealing(BaseLocalSearch):
+    """
+    Simulated annealing: scores one random move per iteration and accepts it if it
+    improves the fitness, or with probability exp(-delta / temperature) otherwise.
+    The temperature starts at initial_temperature and is multiplied by cooling_rate
+    every iteration (down to min_temperature).
+    """
+    def __init__(self, players, initial_temperature=1.0, cooling_rate=0.995, min_temperature=1e-4, **kwargs):
+        super().__init__(players, **kwargs)
+        self.initial_temperature = initial_temperature
+        self.cooling_rate = cooling_rate
+        self.min_temperature = min_temperature
+        self.temperature = initial_temperature
+
+    def checkpoint_state(self):
+        return dict(super().checkpoint_state(), temperature=np.float64(self.temperature))
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        self.temperature = float(state['temperature'])
+
+    def step(self):
+        move = Neighbourhood.random_move(self.current)
+        if move is not None:
+            fit = self.score_move(move)
+            delta = fit - self.current_fitness
+            if delta <= 0 or random.random() < math.exp(-delta / self.temperature):
+                self.accept(move, fit)
+        self.temperature = max(self.temperature * self.cooling_rate, self.min_temperature)
+
+
+class TabuSearch(BaseLocalSearch):
+    """
+    Tabu search: moves to the best scored neighbour, even if it is worse, that does
+    not move a player moved during the last tenure iterations. A tabu move is still
+    allowed when it improves on the best fitness found (aspiration).
+    """
+    def __init__(self, players, tenure=7, **kwargs):
+        super().__init__(players, **kwargs)
+        self.tenure = tenure
+        # Player id -> first iteration at which the player can be moved again
+        self.tabu = {}
+
+    def checkpoint_state(self):
+        return dict(super().checkpoint_state(),
+                    tabu_ids=np.array(list(self.tabu), dtype=np.int64),
+                    tabu_until=np.array(list(self.tabu.values()), dtype=np.int64))
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        self.tabu = dict(zip(state['tabu_ids'].tolist(), state['tabu_until'].tolist()))
+
+    def is_admissible(self, move, fit):
+        _, _, player_in, player_out = move
+        tabu = (self.tabu.get(player_in.id, 0) > self.iteration
+                or self.tabu.get(player_out.id, 0) > self.iteration)
+        return not tabu or fit < self.best_fitness
+
+    def step(self):
+        moves = Neighbourhood.sample_moves(self.current, self.neighbourhood_size)
+        move, fit = self.best_move(moves, self.is_admissible)
+        if move is not None:
+            self.accept(move, fit)
+            _, _, player_in, player_out = move
+            self.tabu[player_in.id] = self.tabu[player_out.id] = self.iteration + 1 + self.tenure
+
+
+# Local-search engines by name, as GeneticAlgorithm.ALGORITHMS for the GA classes
+LOCAL_SEARCHES = {
+    'hill_climbing': HillClimbing,
+    'simulated_annealing': SimulatedAnnealing,
+    'tabu_search': TabuSearch,
+}
@@ -1,9 +1,5 @@
 import random
 
-from League import League 
-
-NUM_TEAMS = 5
-
 class MutationMethods:
     """Class containing different mutation methods for the genetic algorithm"""
     
@@ -16,26 +12,21 @@ class MutationMethods:
         if random.random() > mutation_rate:
             return league
         
-        # Make a deep copy of the league to avoid modifying the original
-        mutated = League()
-        for i, team in enumerate(league.teams):
-            for player in team.players:
-                mutated.teams[i].add_player(player)
-        
         # Randomly select two teams
-        team_idx1 = random.randint(0, NUM_TEAMS - 1)
-        team_idx2 = random.randint(0, NUM_TEAMS - 1)
+        num_teams = league.problem.num_teams
+        team_idx1 = random.randint(0, num_teams - 1)
+        team_idx2 = random.randint(0, num_teams - 1)
         
         # Make sure teams are different
         while team_idx1 == team_idx2:
-            team_idx2 = random.randint(0, NUM_TEAMS - 1)
+            team_idx2 = random.randint(0, num_teams - 1)
         
         # Randomly select a position to swap
-        pos = random.choice(['GK', 'DEF', 'MID', 'FWD'])
+        pos = random.choice(league.problem.positions)
         
         # Get players of the selected position from both teams
-        team1_players = [p for p in mutated.teams[team_idx1].players if p.position == pos]
-        team2_players = [p for p in mutated.teams[team_idx2].players if p.position == pos]
+        team1_players = [p for p in league.teams[team_idx1].players if p.position == pos]
+        team2_players = [p for p in league.teams[team_idx2].players if p.position == pos]
         
         # If either team doesn't have players of this position, don't mutate
         if not team1_players or not team2_players:
@@ -45,14 +36,22 @@ class MutationMethods:
         player1 = random.choice(team1_players)
         player2 = random.choice(team2_players)
         
+        # Copy the league, sharing the teams that are not modified
+        mutated = league.copy()
+        team1 = mutated.mutable_team(team_idx1)
+        team2 = mutated.mutable_team(team_idx2)
+        
         # Swap the players
         # First, remove the players from their teams
-        mutated.teams[team_idx1].players.remove(player1)
-        mutated.teams[team_idx2].players.remove(player2)
+        team1.remove_player(player1)
+        team2.remove_player(player2)
         
         # Then, add them to the opposite teams
-        mutated.teams[team_idx1].add_player(player2)
-        mutated.teams[team_idx2].add_player(player1)
+        team1.add_player(player2)
+        team2.add_player(player1)
+        
+        # Report the move so the parent's cached aggregates can be updated incrementally
+        mutated.inherit_stats(league, [(team_idx1, team_idx2, player2, player1)])
         
         return mutated
     
@@ -65,39 +64,30 @@ class MutationMethods:
         if random.random() > mutation_rate:
             return league
         
-        # Make a deep copy of the league to avoid modifying the original
-        mutated = League()
-        for i, team in enumerate(league.teams):
-            for player in team.players:
-                mutated.teams[i].add_player(player)
+        # Copy the league, sharing the teams that are not modified
+        mutated = league.copy()
         
         # Randomly select a position to shuffle
-        pos = random.choice(['GK', 'DEF', 'MID', 'FWD'])
+        pos = random.choice(league.problem.positions)
         
         # Collect all players of this position
-        all_pos_players = []
-        for team in mutated.teams:
-            for player in team.players[:]:
-                if player.position == pos:
-                    all_pos_players.append(player)
-                    team.players.remove(player)
+        all_pos_players = [player for team in league.teams for player in team.players if player.position == pos]
         
         # Shuffle these players
         random.shuffle(all_pos_players)
         
         # Reassign players to teams
-        for i, team in enumerate(mutated.teams):
-            if pos == 'GK':
-                # Each team gets 1 GK
-                if i < len(all_pos_players):
-                    team.add_player(all_pos_players[i])
-            else:
-                # Each team gets 2 players for other positions
-                start_idx = i * 2
-                for j in range(2):
-                    idx = start_idx + j
-                    if idx < len(all_pos_players):
-                        team.add_player(all_pos_players[idx])
+        for i, team in enumerate(league.teams):
+            # Keep the players of the other positions
+            mutated_team = mutated.mutable_team(i)
+            mutated_team.set_players([player for player in team.players if player.position != pos])
+            # Each team gets the number of players of the formation (1 GK, 2 for other positions by default)
+            quota = league.problem.formation[pos]
+            start_idx = i * quota
+            for j in range(quota):
+                idx = start_idx + j
+                if idx < len(all_pos_players):
+                    mutated_team.add_player(all_pos_players[idx])
         
         return mutated
     
@@ -110,93 +100,44 @@ class MutationMethods:
         if random.random() > mutation_rate:
             return league
         
-        # Make a deep copy of the league to avoid modifying the original
-        mutated = League()
-        for i, team in enumerate(league.teams):
-            for player in team.players:
-                mutated.teams[i].add_player(player)
+        # Copy the league, sharing the teams that are not modified
+        mutated = league.copy()
+        num_teams = league.problem.num_teams
         
         # Randomly select a team to scramble
-        team_idx = random.randint(0, NUM_TEAMS - 1)
-        
-        # Group players by position (we need to maintain position constraints)
-        gk_players = [p for p in mutated.teams[team_idx].players if p.position == 'GK'] 
-        def_players = [p for p in mutated.teams[team_idx].players if p.position == 'DEF']
-        mid_players = [p for p in mutated.teams[team_idx].players if p.position == 'MID']
-        fwd_players = [p for p in mutated.teams[team_idx].players if p.position == 'FWD']
+        team_idx = random.randint(0, num_teams - 1)
+        team = mutated.mutable_team(team_idx)
+        # Player moves between teams, reported for incremental fitness evaluation
+        moves = []
         
         # Since we can't swap players between positions, we'll just scramble within each position group
-        # For GK, there's only one, so no scrambling
-        # For other positions, we can swap players within the team
-        
-        # Scramble DEF
-        if len(def_players) >= 2:
-            for i in range(len(def_players)):
-                swap_idx = random.randint(0, len(def_players) - 1)
-                # Check if we can swap with another team
-                if random.random() < 0.5:
-                    # Randomly select another team
-                    other_team_idx = random.randint(0, NUM_TEAMS - 1)
-                    while other_team_idx == team_idx:
-                        other_team_idx = random.randint(0, NUM_TEAMS - 1)
-                    
-                    # Get DEF players from the other team
-                    other_defs = [p for p in mutated.teams[other_team_idx].players if p.position == 'DEF']
-                    if other_defs:
-                        # Swap with a random DEF from the other team
-                        other_def = random.choice(other_defs)
-                        mutated.teams[other_team_idx].players.remove(other_def)
-                        mutated.teams[team_idx].players.remove(def_players[i])
-                        
-                        mutated.teams[other_team_idx].add_player(def_players[i])
-                        mutated.teams[team_idx].add_player(other_def)
-        
-        # Scramble MID      
-        if len(mid_players) >= 2:
-            for i in range(len(mid_players)):
-                swap_idx = random.randint(0, len(mid_players) - 1)
-                # Check if we can swap with another team
-                if random.random() < 0.5:
-                    # Randomly select another team
-                    other_team_idx = random.randint(0, NUM_TEAMS - 1)
-                    while other_team_idx == team_idx:
-                        other_team_idx = random.randint(0, NUM_TEAMS - 1)
-                    
-                    # Get MID players from the other team
-                    other_mids = [p for p in mutated.teams[other_team_idx].players if p.position == 'MID']
-                    if other_mids:
-                        # Swap with a random MID from the other team
-                        other_mid = random.choice(other_mids)
-                        mutated.teams[other_team_idx].players.remove(other_mid)
-                        mutated.teams[team_idx].players.remove(mid_players[i])
-                        
-                        mutated.teams[other_team_idx].add_player(mid_players[i])
-                        mutated.teams[team_idx].add_player(other_mid)
-                mutated.teams[team_idx].players[i], mutated.teams[team_idx].players[swap_idx] = \
-                    mutated.teams[team_idx].players[swap_idx], mutated.teams[team_idx].players[i]
-                
-        # Scramble FWD      
-        if len(fwd_players) >= 2:
-            for i in range(len(fwd_players)):
-                swap_idx = random.randint(0, len(fwd_players) - 1)
+        # Groups with a single player (the GK in the default formation) are not scrambled
+        for pos in league.problem.positions:
+            pos_players = [p for p in team.players if p.position == pos]
+            if len(pos_players) < 2:
+                continue
+            for i in range(len(pos_players)):
+                swap_idx = random.randint(0, len(pos_players) - 1)
                 # Check if we can swap with another team
                 if random.random() < 0.5:
                     # Randomly select another team
-                    other_team_idx = random.randint(0, NUM_TEAMS - 1)
+                    other_team_idx = random.randint(0, num_teams - 1)
                     while other_team_idx == team_idx:
-                        other_team_idx = random.randint(0, NUM_TEAMS - 1)
+                        other_team_idx = random.randint(0, num_teams - 1)
                     
-                    # Get FWD players from the other team
-                    other_fwds = [p for p in mutated.teams[other_team_idx].players if p.position == 'FWD']
-                    if other_fwds:
-                        # Swap with a random FWD from the other team
-                        other_fwd = random.choice(other_fwds)
-                        mutated.teams[other_team_idx].players.remove(other_fwd)
-                        mutated.teams[team_idx].players.remove(fwd_players[i])
+                    # Get players of the same position from the other team
+                    other_pos_players = [p for p in mutated.teams[other_team_idx].players if p.position == pos]
+                    if other_pos_players:
+                        # Swap with a random player of the same position from the other team
+                        other_player = random.choice(other_pos_players)
+                        other_team = mutated.mutable_team(other_team_idx)
+                        other_team.remove_player(other_player)
+                        team.remove_player(pos_players[i])
                         
-                        mutated.teams[other_team_idx].add_player(fwd_players[i])
-                        mutated.teams[team_idx].add_player(other_fwd)
-                mutated.teams[team_idx].players[i], mutated.teams[team_idx].players[swap_idx] = \
-                    mutated.teams[team_idx].players[swap_idx], mutated.teams[team_idx].players[i] 
+                        other_team.add_player(pos_players[i])
+                        team.add_player(other_player)
+                        moves.append((team_idx, other_team_idx, other_player, pos_players[i]))
+                team.players[i], team.players[swap_idx] = team.players[swap_idx], team.players[i]
 
+        mutated.inherit_stats(league, moves)
         return mutated
\ No newline at end of file
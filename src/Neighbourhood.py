@@ -0,0 +1,96 @@
+import random
+
+
+class Neighbourhood:
+    """
+    Same-position swap neighbourhood of a league, shared by the local-search engines
+    and the memetic mode of the genetic algorithm
+
+    A move (team_a, team_b, player_in, player_out) swaps player_out of team_a with
+    player_in of team_b, two players of the same position; it is the move format of
+    LeagueStats.apply_move, so moves are scored from the cached aggregates in O(1).
+    """
+
+    @staticmethod
+    def random_move(league):
+        """A random move (same draw as swap_mutation), None if the drawn teams have no player to swap"""
+        num_teams = league.problem.num_teams
+        if num_teams < 2:
+            return None
+        team_a = random.randint(0, num_teams - 1)
+        team_b = random.randint(0, num_teams - 1)
+        while team_a == team_b:
+            team_b = random.randint(0, num_teams - 1)
+        pos = random.choice(league.problem.positions)
+        players_a = [p for p in league.teams[team_a].players if p.position == pos]
+        players_b = [p for p in league.teams[team_b].players if p.position == pos]
+        if not players_a or not players_b:
+            return None
+        return (team_a, team_b, random.choice(players_b), random.choice(players_a))
+
+    @staticmethod
+    def moves(league):
+        """Every move of the neighbourhood (num_teams * (num_teams - 1) / 2 * sum of squared quotas for a valid league)"""
+        moves = []
+        for pos in league.problem.positions:
+            groups = [[p for p in team.players if p.position == pos] for team in league.teams]
+            for team_a in range(len(groups)):
+                for team_b in range(team_a + 1, len(groups)):
+                    for player_out in groups[team_a]:
+                        for player_in in groups[team_b]:
+                            moves.append((team_a, team_b, player_in, player_out))
+        return moves
+
+    @staticmethod
+    def sample_moves(league, n_moves):
+        """n_moves random moves (with repetition); the whole neighbourhood when n_moves is None"""
+        if n_moves is None:
+            return Neighbourhood.moves(league)
+        moves = (Neighbourhood.random_move(league) for _ in range(n_moves))
+        return [move for move in moves if move is not None]
+
+    @staticmethod
+    def move_fitness(stats, move):
+        """Fitness of the league described by stats after the move; stats is left unchanged"""
+        team_a, team_b, player_in, player_out = move
+        value = stats.value
+        stats.apply_move(team_a, team_b, player_in, player_out)
+        fitness = stats.fitness()
+        # Undo the move: the aggregates are integer sums, so they are restored exactly
+        stats.apply_move(team_a, team_b, player_out, player_in)
+        stats.value = value
+        return fitness
+
+    @staticmethod
+    def apply(league, move):
+        """New league with the move applied, sharing the unchanged teams with league"""
+        team_a, team_b, player_in, player_out = move
+        moved = league.copy()
+        moved.mutable_team(team_a).remove_player(player_out)
+        moved.mutable_team(team_b).remove_player(player_in)
+        moved.teams[team_a].add_player(player_in)
+        moved.teams[team_b].add_player(player_out)
+        moved.inherit_stats(league, [move])
+        return moved
+
+    @staticmethod
+    def hill_climb(league, fitness, n_moves):
+        """
+        First-improvement hill climbing: tries n_moves random moves and applies
+        every move that improves the fitness
+
+        Returns (league, fitness, number of moves scored).
+        """
+        stats = league.get_stats()
+        scored = 0
+        for _ in range(n_moves):
+            move = Neighbourhood.random_move(league)
+            if move is None:
+                continue
+            scored += 1
+            move_fitness = Neighbourhood.move_fitness(stats, move)
+            if move_fitness < fitness:
+                league = Neighbourhood.apply(league, move)
+                stats = league.stats
+                stats.value = fitness = move_fitness
+        return league, fitness, scored
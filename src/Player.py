@@ -1,11 +1,38 @@
+# Position names interned as small integer codes, shared by every Player and Problem.
+# The default positions always get the codes 0-3, other positions are added on first use.
+POSITIONS = []
+_position_codes = {}
+
+
+def position_code(position):
+    """Integer code of a position name"""
+    code = _position_codes.get(position)
+    if code is None:
+        code = _position_codes[position] = len(POSITIONS)
+        POSITIONS.append(position)
+    return code
+
+
+for _position in ('GK', 'DEF', 'MID', 'FWD'):
+    position_code(_position)
+
+
 class Player:
     """Class to represent a player"""
+    __slots__ = ('id', 'name', 'position', 'pos_code', 'skill', 'salary')
+
     def __init__(self, id, name, position, skill, salary):
         self.id = id
         self.name = name
-        self.position = position
+        self.pos_code = position_code(position)
+        # The interned name, so that position comparisons are identity checks
+        self.position = POSITIONS[self.pos_code]
         self.skill = skill
         self.salary = salary
     
+    def __reduce__(self):
+        # Pickled by position name: the codes of non-default positions depend on the process
+        return (Player, (self.id, self.name, self.position, self.skill, self.salary))
+
     def __str__(self):
         return f"{self.name} ({self.position}, Skill={self.skill}, Salary={self.salary}M€)"
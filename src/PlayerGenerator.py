@@ -0,0 +1,39 @@
+import math
+
+import numpy as np
+
+from Player import Player
+from Problem import DEFAULT_PROBLEM
+
+
+# Skill and salary model fitted to the players CSV:
+# skill ~ N(86.5, 4) clipped to [70, 99], salary ~ 90 * exp(0.055 * (skill - 85)) with ~5% noise
+SKILL_MEAN = 86.5
+SKILL_STD = 4.0
+SKILL_RANGE = (70, 99)
+SALARY_AT_85 = 90.0
+SALARY_GROWTH = 0.055
+SALARY_NOISE = 0.05
+
+
+def generate_players(problem=DEFAULT_PROBLEM, seed=None, surplus=0.0):
+    """
+    Generates a synthetic player pool for the given problem
+
+    Every position gets exactly the number of players needed to fill all teams,
+    plus a surplus fraction (rounded up) of extra candidates. Skills and salaries
+    follow the distribution of the players CSV, so the default budget stays
+    meaningful for any number of teams. The same seed always gives the same pool,
+    and the global random generators are left untouched.
+    """
+    rng = np.random.RandomState(seed)
+    players = []
+    for pos, needed in problem.players_needed().items():
+        n = needed + math.ceil(needed * surplus)
+        skills = np.clip(np.rint(rng.normal(SKILL_MEAN, SKILL_STD, n)), *SKILL_RANGE).astype(int)
+        salaries = np.rint(SALARY_AT_85 * np.exp(SALARY_GROWTH * (skills - 85))
+                           * rng.lognormal(0.0, SALARY_NOISE, n)).astype(int)
+        for skill, salary in zip(skills.tolist(), salaries.tolist()):
+            player_id = len(players)
+            players.append(Player(player_id, f"Player {player_id}", pos, skill, salary))
+    return players
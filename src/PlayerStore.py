@@ -0,0 +1,181 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from Player import POSITIONS, Player, position_code
+
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'Data', 'players(in).csv')
+
+# Header of the player CSV: an unnamed index column (the player id) and four named columns
+CSV_HEADER = ['', 'Name', 'Position', 'Skill', 'Salary (€M)']
+
+# Version of the binary cache layout, bumped whenever it changes
+CACHE_VERSION = 1
+COLUMNS = ('ids', 'names', 'pos_codes', 'skills', 'salaries')
+
+
+class PlayerStore:
+    """
+    Columnar player table: ids, position codes, skills and salaries as contiguous
+    numpy arrays, plus the names
+
+    The store behaves as a read-only sequence of Players, created on first access
+    (see players()), so code that only needs the columns (e.g. ArrayEngine) never
+    builds Player objects. A store loaded from its binary cache memory-maps the
+    columns, and is pickled as its cache directory: worker processes re-map the
+    same files instead of receiving a copy of the data.
+    """
+    def __init__(self, ids, names, pos_codes, skills, salaries, cache_dir=None):
+        self.ids = ids
+        self.names = names
+        self.pos_codes = pos_codes
+        self.skills = skills
+        self.salaries = salaries
+        self.cache_dir = cache_dir
+        self._players = [None] * len(ids)
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH):
+        """Parses and validates the player CSV (see CSV_HEADER)"""
+        ids, names, positions, skills, salaries = [], [], [], [], []
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header != CSV_HEADER:
+                raise ValueError(f"{path}: expected header {CSV_HEADER}, got {header}")
+            for line, row in enumerate(reader, start=2):
+                if len(row) != len(CSV_HEADER):
+                    raise ValueError(f"{path}:{line}: expected {len(CSV_HEADER)} columns, got {len(row)}")
+                try:
+                    player_id, skill, salary = int(row[0]), int(row[3]), int(row[4])
+                except ValueError:
+                    raise ValueError(f"{path}:{line}: id, skill and salary must be integers") from None
+                if not row[1] or not row[2]:
+                    raise ValueError(f"{path}:{line}: empty name or position")
+                if salary < 0:
+                    raise ValueError(f"{path}:{line}: negative salary")
+                ids.append(player_id)
+                names.append(row[1])
+                positions.append(row[2])
+                skills.append(skill)
+                salaries.append(salary)
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"{path}: duplicated player ids")
+        return cls(np.array(ids, dtype=np.int64),
+                   np.array(names, dtype=str),
+                   np.array([position_code(pos) for pos in positions], dtype=np.int16),
+                   np.array(skills, dtype=np.int64),
+                   np.array(salaries, dtype=np.int64))
+
+    def save_cache(self, cache_dir, source=None):
+        """
+        Writes the columns to cache_dir as .npy files, with the position names of
+        the codes and, for invalidation, the size and mtime of the source file
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        for name in COLUMNS:
+            # Write next to the target and rename, so a crash never leaves a truncated column
+            tmp_path = os.path.join(cache_dir, name + '.npy.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp_path, os.path.join(cache_dir, name + '.npy'))
+        meta = {'version': CACHE_VERSION, 'positions': list(POSITIONS), 'source': _source_stamp(source)}
+        tmp_path = os.path.join(cache_dir, 'meta.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(cache_dir, 'meta.json'))
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def load_cache(cls, cache_dir, source=None):
+        """
+        Memory-maps a cache written by save_cache; returns None when it is missing,
+        of another layout version or older than the source file
+        """
+        try:
+            with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != CACHE_VERSION:
+            return None
+        if source is not None and meta.get('source') != _source_stamp(source):
+            return None
+        columns = {name: np.load(os.path.join(cache_dir, name + '.npy'), mmap_mode='r') for name in COLUMNS}
+        # Position codes depend on the process: map the cached codes to the codes of this one
+        remap = np.array([position_code(pos) for pos in meta['positions']], dtype=np.int16)
+        if not np.array_equal(remap, np.arange(len(remap))):
+            columns['pos_codes'] = remap[columns['pos_codes']]
+        return cls(cache_dir=cache_dir, **columns)
+
+    def __reduce__(self):
+        if self.cache_dir is not None:
+            return (_load_cached_store, (self.cache_dir,))
+        return (PlayerStore, (self.ids, self.names, self.pos_codes, self.skills, self.salaries))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        player = self._players[index]
+        if player is None:
+            player = self._players[index] = Player(int(self.ids[index]), str(self.names[index]),
+                                                   POSITIONS[self.pos_codes[index]],
+                                                   int(self.skills[index]), int(self.salaries[index]))
+        return player
+
+    def __iter__(self):
+        return iter(self.players())
+
+    def players(self):
+        """All the players as Player objects (created once, then reused)"""
+        if any(player is None for player in self._players):
+            ids, names, skills, salaries = (self.ids.tolist(), self.names.tolist(),
+                                            self.skills.tolist(), self.salaries.tolist())
+            positions = [POSITIONS[code] for code in self.pos_codes.tolist()]
+            for i, player in enumerate(self._players):
+                if player is None:
+                    self._players[i] = Player(ids[i], names[i], positions[i], skills[i], salaries[i])
+        return list(self._players)
+
+    def position_names(self):
+        """Position name of every player"""
+        return [POSITIONS[code] for code in self.pos_codes.tolist()]
+
+
+def _source_stamp(source):
+    if source is None:
+        return None
+    stat = os.stat(source)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _load_cached_store(cache_dir):
+    store = PlayerStore.load_cache(cache_dir)
+    if store is None:
+        raise ValueError(f"Player cache {cache_dir} is missing or outdated")
+    return store
+
+
+def load_player_store(path=DATA_PATH, cache_dir=None, use_cache=True):
+    """
+    Loads the player CSV as a PlayerStore
+
+    The parsed columns are cached in cache_dir (by default path + '.cache') and
+    memory-mapped from there on the next loads, until the CSV changes.
+    use_cache=False always parses the CSV and writes no cache.
+    """
+    if not use_cache:
+        return PlayerStore.from_csv(path)
+    if cache_dir is None:
+        cache_dir = path + '.cache'
+    store = PlayerStore.load_cache(cache_dir, source=path)
+    if store is None:
+        PlayerStore.from_csv(path).save_cache(cache_dir, source=path)
+        store = PlayerStore.load_cache(cache_dir, source=path)
+    return store
@@ -0,0 +1,62 @@
+from Player import POSITIONS, position_code
+
+
+class Problem:
+    """
+    Definition of a league-balancing problem, read by the model and by every operator
+
+    num_teams: number of teams in the league
+    formation: players required per position in every team, e.g. {'GK': 1, 'DEF': 2, ...}
+    budget_limit: maximum total salary of a team (in million €)
+    """
+    COUNT_BITS = 16
+
+    def __init__(self, num_teams=5, formation=None, budget_limit=750):
+        self.num_teams = num_teams
+        self.formation = dict(formation or {'GK': 1, 'DEF': 2, 'MID': 2, 'FWD': 2})
+        self.budget_limit = budget_limit
+        # Positions in a fixed order, used for position codes and count vectors
+        self.positions = list(self.formation)
+        self.formation_counts = tuple(self.formation[pos] for pos in self.positions)
+        self.team_size = sum(self.formation_counts)
+        # Index in positions of every interned position code (see Player.position_code);
+        # -1 for the positions outside the formation
+        codes = [position_code(pos) for pos in self.positions]
+        self.position_index = [-1] * len(POSITIONS)
+        for i, code in enumerate(codes):
+            self.position_index[code] = i
+        # Teams pack their position counts in one int, COUNT_BITS bits per position plus a
+        # last field for players of positions outside the formation (see Team.add_player)
+        self.count_weights = [1 << (self.COUNT_BITS * i) for i in range(len(self.positions) + 1)]
+        self.packed_quotas = sum(quota * weight for quota, weight in zip(self.formation_counts, self.count_weights))
+
+    @property
+    def n_players(self):
+        """Number of players needed to fill every team"""
+        return self.num_teams * self.team_size
+
+    def position_slot(self, player):
+        """Index of the player's position in positions, -1 if it is not part of the formation"""
+        code = player.pos_code
+        return self.position_index[code] if code < len(self.position_index) else -1
+
+    def count_weight(self, player):
+        """Amount added to a team's packed position counts by the player"""
+        return self.count_weights[self.position_slot(player)]
+
+    def unpack_counts(self, packed):
+        """Position counts (in positions order) of a packed count"""
+        mask = (1 << self.COUNT_BITS) - 1
+        return tuple(packed >> (self.COUNT_BITS * i) & mask for i in range(len(self.positions)))
+
+    def players_needed(self):
+        """Number of players needed per position"""
+        return {pos: quota * self.num_teams for pos, quota in self.formation.items()}
+
+    def __repr__(self):
+        return (f"Problem(num_teams={self.num_teams}, formation={self.formation}, "
+                f"budget_limit={self.budget_limit})")
+
+
+# The 5-team, 1 GK / 2 DEF / 2 MID / 2 FWD, 750M€ problem of the players CSV
+DEFAULT_PROBLEM = Problem()
@@ -0,0 +1,118 @@
+import os
+import re
+
+import numpy as np
+
+
+# matplotlib is imported by the functions that draw, so that importing this module
+# stays cheap. Figures are drawn with the non-interactive Agg canvas: no window, no
+# display needed, and no global pyplot state kept alive between figures.
+
+def _figure(figsize=(10, 6)):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _label_axes(ax, title):
+    ax.set_xlabel('Generation')
+    ax.set_ylabel('Best Fitness (StdDev)')
+    ax.set_title(title)
+    ax.grid(True)
+
+
+def _file_name(name):
+    return re.sub(r'[^\w.-]+', '_', str(name))
+
+
+def render_fitness_history(history, path, title='Best Fitness per Generation'):
+    """Saves the plot of one fitness history to path (the format follows the extension)"""
+    figure = _figure()
+    ax = figure.add_subplot()
+    ax.plot(history)
+    _label_axes(ax, title)
+    figure.savefig(path)
+
+
+def render_fitness_reports(histories, out_dir, fmt='png', overview=True, log_scale=False):
+    """
+    Renders the fitness curves of many finished runs to image files in one batch
+
+    histories maps a run name to its fitness history (or is a list of (name, history)).
+    Every run gets its own <name>.<fmt> file in out_dir and, with overview=True, all
+    the curves are also drawn together in overview.<fmt>. Penalised fitness values
+    (500 and more) dwarf the std-devs, log_scale=True keeps both readable.
+    Returns the paths written.
+    """
+    items = list(histories.items()) if isinstance(histories, dict) else list(histories)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, history in items:
+        path = os.path.join(out_dir, f"{_file_name(name)}.{fmt}")
+        render_fitness_history(history, path, title=str(name))
+        paths.append(path)
+
+    if overview and items:
+        figure = _figure(figsize=(12, 7))
+        ax = figure.add_subplot()
+        for name, history in items:
+            ax.plot(history, label=str(name), linewidth=1)
+        _label_axes(ax, f"Best Fitness per Generation ({len(items)} runs)")
+        if log_scale:
+            ax.set_yscale('log')
+        if len(items) <= 12:
+            ax.legend(fontsize='small')
+        path = os.path.join(out_dir, f"overview.{fmt}")
+        figure.savefig(path)
+        paths.append(path)
+    return paths
+
+
+def render_experiment_report(results_path, out_dir, fmt='png', log_scale=False):
+    """
+    Renders the results file of an ExperimentRunner sweep: one figure per config
+    with the curve of every seed and their median, and an overview of the medians
+    """
+    from ExperimentRunner import load_results
+    results = load_results(results_path)
+    runs = {}
+    for config, seed, history in zip(results['config'].tolist(), results['seed'].tolist(),
+                                     results['fitness_history']):
+        runs.setdefault(config, []).append((seed, np.asarray(history)))
+
+    os.makedirs(out_dir, exist_ok=True)
+    medians = {}
+    paths = []
+    for config, seed_runs in sorted(runs.items()):
+        figure = _figure()
+        ax = figure.add_subplot()
+        for seed, history in seed_runs:
+            ax.plot(history, color='tab:gray', alpha=0.4, linewidth=1)
+        # Runs stopped early are padded with their final value
+        length = max(len(history) for _, history in seed_runs)
+        padded = np.array([np.pad(history, (0, length - len(history)), mode='edge') for _, history in seed_runs])
+        medians[config] = np.median(padded, axis=0)
+        ax.plot(medians[config], color='tab:blue', linewidth=2, label=f"median of {len(seed_runs)} seeds")
+        _label_axes(ax, config)
+        if log_scale:
+            ax.set_yscale('log')
+        ax.legend()
+        path = os.path.join(out_dir, f"{_file_name(config)}.{fmt}")
+        figure.savefig(path)
+        paths.append(path)
+
+    if medians:
+        figure = _figure(figsize=(12, 7))
+        ax = figure.add_subplot()
+        for config, median in medians.items():
+            ax.plot(median, label=config, linewidth=1)
+        _label_axes(ax, f"Median Best Fitness per Generation ({len(medians)} configs)")
+        if log_scale:
+            ax.set_yscale('log')
+        ax.legend(fontsize='x-small')
+        path = os.path.join(out_dir, f"overview.{fmt}")
+        figure.savefig(path)
+        paths.append(path)
+    return paths
@@ -1,4 +1,7 @@
 import random
+from itertools import accumulate
+
+import numpy as np
 
 class SelectionMethods:
     """Class containing different selection methods for the genetic algorithm"""
@@ -48,3 +51,138 @@ class SelectionMethods:
         
         # Fallback (shouldn't reach here normally)
         return random.choice(population)
+
+    @staticmethod
+    def tournament_contestants(pop_size, n_tournaments, tournament_size=3):
+        """
+        Draws the contestants of n_tournaments tournaments as a (n_tournaments, tournament_size)
+        matrix of population indices, distinct within every row
+
+        Rows are drawn with replacement and only the rows holding a repeated index are drawn
+        again, so the cost is O(tournament_size) per tournament, whatever the population size.
+        Draws come from numpy's global generator, which the runs seed and checkpoint along
+        with random.
+        """
+        if tournament_size > pop_size:
+            raise ValueError("Tournament larger than the population")
+        contestants = np.random.randint(0, pop_size, size=(n_tournaments, tournament_size))
+        while True:
+            ordered = np.sort(contestants, axis=1)
+            repeated = np.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(axis=1))
+            if not len(repeated):
+                return contestants
+            if 2 * tournament_size > pop_size:
+                # Tournaments close to the population size rarely come out distinct:
+                # the smallest of uniform keys are a sample without replacement
+                keys = np.random.random((len(repeated), pop_size))
+                contestants[repeated] = np.argpartition(keys, tournament_size - 1, axis=1)[:, :tournament_size]
+                return contestants
+            contestants[repeated] = np.random.randint(0, pop_size, size=(len(repeated), tournament_size))
+
+    @staticmethod
+    def tournament_selection_batch(population, fitnesses, n_parents, tournament_size=3):
+        """
+        Select n_parents individuals at once using tournament selection
+
+        fitnesses holds the precomputed fitness of every individual of the population.
+        All tournaments are drawn as one (n_parents, tournament_size) index matrix
+        (see tournament_contestants); like tournament_selection, the contestants of a
+        tournament are distinct individuals.
+        """
+        fitnesses = np.asarray(fitnesses)
+        contestants = SelectionMethods.tournament_contestants(len(population), n_parents, tournament_size)
+        # Index of the best contestant in every row
+        winners = contestants[np.arange(n_parents), np.argmin(fitnesses[contestants], axis=1)]
+        return [population[i] for i in winners]
+
+    @staticmethod
+    def roulette_wheel_selection_batch(population, fitnesses, n_parents):
+        """
+        Select n_parents individuals at once using roulette wheel selection
+
+        fitnesses holds the precomputed fitness of every individual of the population.
+        The cumulative distribution of the transformed fitness is built once and
+        every parent is drawn from it by binary search.
+        """
+        # Same transformation as roulette_wheel_selection (minimization)
+        cumulative = list(accumulate(1.0 / (f + 0.01) for f in fitnesses))
+        return random.choices(population, cum_weights=cumulative, k=n_parents)
+
+
+class TournamentSampler:
+    """
+    Tournament selection over a population changed one slot at a time (steady-state mode)
+
+    Only the contestants of a tournament are looked at, so a draw costs O(tournament_size)
+    whatever the population size. fitnesses is the population's fitness array, shared
+    and updated in place by the caller.
+    """
+    def __init__(self, fitnesses, tournament_size=3):
+        self.fitnesses = fitnesses
+        self.tournament_size = tournament_size
+
+    def update(self, slot, fitness):
+        # The fitness array is shared with the population
+        pass
+
+    def sample(self, n):
+        """Slots of the winners of n tournaments"""
+        contestants = SelectionMethods.tournament_contestants(len(self.fitnesses), n, self.tournament_size)
+        return contestants[np.arange(n), np.argmin(self.fitnesses[contestants], axis=1)].tolist()
+
+
+class RouletteWheelSampler:
+    """
+    Roulette wheel selection over a population changed one slot at a time (steady-state mode)
+
+    The selection weights (same transformation as roulette_wheel_selection) are kept in
+    a Fenwick tree over the population slots: replacing an individual and drawing a
+    parent both cost O(log pop_size) instead of rebuilding the cumulative weights.
+    The tree is rebuilt every pop_size updates, so rounding errors do not pile up.
+    """
+    def __init__(self, fitnesses):
+        self.weights = [1.0 / (f + 0.01) for f in np.asarray(fitnesses).tolist()]
+        self.rebuild()
+
+    def rebuild(self):
+        size = len(self.weights)
+        self.tree = [0.0] + self.weights
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                self.tree[parent] += self.tree[i]
+        self.total = sum(self.weights)
+        self.updates = 0
+        # Highest power of two not above the size, where the search descends from
+        self.top = 1 << (size.bit_length() - 1) if size else 0
+
+    def update(self, slot, fitness):
+        weight = 1.0 / (fitness + 0.01)
+        delta = weight - self.weights[slot]
+        self.weights[slot] = weight
+        self.updates += 1
+        if self.updates >= len(self.weights):
+            self.rebuild()
+            return
+        self.total += delta
+        i = slot + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def sample(self, n):
+        """Slots of n individuals drawn with probability proportional to their weight"""
+        size = len(self.weights)
+        slots = []
+        for _ in range(n):
+            # Largest prefix of the slots whose total weight stays below r
+            r = random.random() * self.total
+            pos = 0
+            step = self.top
+            while step:
+                if pos + step <= size and self.tree[pos + step] <= r:
+                    pos += step
+                    r -= self.tree[pos]
+                step >>= 1
+            slots.append(min(pos, size - 1))
+        return slots
@@ -1,33 +1,83 @@
+from Problem import DEFAULT_PROBLEM
+
+
 class Team:
-    BUDGET_LIMIT = 750  # in million €
+    BUDGET_LIMIT = DEFAULT_PROBLEM.budget_limit  # in million €
     """Class to represent a team"""
-    def __init__(self, team_id):
+    # Salary and skill totals and position counts are kept up to date by add_player,
+    # remove_player, replace_player and set_players, so the budget, formation and
+    # average skill checks are O(1). Change the players only through these methods
+    # (reordering the players list is fine).
+    __slots__ = ('id', 'players', 'problem', 'budget_limit', 'total_salary', 'total_skill', 'packed_counts')
+
+    def __init__(self, team_id, problem=DEFAULT_PROBLEM):
         self.id = team_id
         self.players = []
-        self.budget_limit = Team.BUDGET_LIMIT
+        self.problem = problem
+        self.budget_limit = problem.budget_limit
+        self.total_salary = 0
+        self.total_skill = 0
+        # Players per position packed in one int (see Problem.count_weight)
+        self.packed_counts = 0
     
     def add_player(self, player):
         self.players.append(player)
+        self.total_salary += player.salary
+        self.total_skill += player.skill
+        self.packed_counts += self.problem.count_weight(player)
+
+    def remove_player(self, player):
+        self.players.remove(player)
+        self.total_salary -= player.salary
+        self.total_skill -= player.skill
+        self.packed_counts -= self.problem.count_weight(player)
+
+    def replace_player(self, old_player, new_player):
+        """Puts new_player at the place of old_player in the players list"""
+        self.players[self.players.index(old_player)] = new_player
+        self.total_salary += new_player.salary - old_player.salary
+        self.total_skill += new_player.skill - old_player.skill
+        self.packed_counts += self.problem.count_weight(new_player) - self.problem.count_weight(old_player)
+
+    def set_players(self, players):
+        self.players = []
+        self.total_salary = 0
+        self.total_skill = 0
+        self.packed_counts = 0
+        for player in players:
+            self.add_player(player)
+    
+    def copy(self):
+        team = Team.__new__(Team)
+        team.id = self.id
+        team.players = self.players.copy()
+        team.problem = self.problem
+        team.budget_limit = self.budget_limit
+        team.total_salary = self.total_salary
+        team.total_skill = self.total_skill
+        team.packed_counts = self.packed_counts
+        return team
     
+    @property
+    def pos_counts(self):
+        """Number of players of every position, in problem.positions order"""
+        return self.problem.unpack_counts(self.packed_counts)
+
     def get_total_salary(self):
-        return sum(player.salary for player in self.players)
+        return self.total_salary
     
     def get_avg_skill(self):
         if not self.players:
             return 0
-        return sum(player.skill for player in self.players) / len(self.players)
+        return self.total_skill / len(self.players)
     
     def is_within_budget(self):
-        return self.get_total_salary() <= self.budget_limit
+        return self.total_salary <= self.budget_limit
     
     def has_valid_formation(self):
-        # Check if the team has exactly 1 GK, 2 DEF, 2 MID, and 2 FWD
-        pos_count = {'GK': 0, 'DEF': 0, 'MID': 0, 'FWD': 0}
-        for player in self.players:
-            pos_count[player.position] = pos_count.get(player.position, 0) + 1
-        
-        return pos_count.get('GK', 0) == 1 and pos_count.get('DEF', 0) == 2 and \
-               pos_count.get('MID', 0) == 2 and pos_count.get('FWD', 0) == 2
+        # Check if the team has exactly the players required by the problem formation
+        # (1 GK, 2 DEF, 2 MID and 2 FWD by default) and no player of another position
+        return self.packed_counts == self.problem.packed_quotas
     
     def __str__(self):
         result = f"Team {self.id+1} (Avg Skill: {self.get_avg_skill():.2f}, Salary: {self.get_total_salary()}M€):\n"
@@ -36,4 +86,3 @@ class Team:
         for player in sorted_players:
             result += f"  - {player}\n"
         return result
-
@@ -0,0 +1,167 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import GeneticAlgorithm
+from ExperimentRunner import init_worker, run_cell
+
+
+# Hyperparameters sampled by default. A list is a set of choices, a (low, high) pair a
+# range sampled uniformly (integers when both bounds are). 'algorithm' is the name of
+# a GeneticAlgorithm_* class; every other key is passed to the algorithm.
+DEFAULT_SPACE = {
+    'algorithm': list(GeneticAlgorithm.ALGORITHMS),
+    'pop_size': (10, 100),
+    'mutation_rate': (0.05, 0.5),
+}
+
+
+class Tuner:
+    """
+    Successive-halving / Hyperband tuner of the GeneticAlgorithm_* hyperparameters
+
+    Sampled configurations are first run for about min_generations generations; only the
+    best 1/eta of them survive each rung and are run again with eta times more
+    generations, up to max_generations. A configuration is scored by its best
+    fitness averaged over seeds, and every (configuration, seed) run of a rung is
+    executed in a process pool, as ExperimentRunner does for its grid.
+
+    The number of generations is the budget multiplied at every rung, so it is not
+    sampled; ga_kwargs are passed unchanged to every run.
+    """
+    def __init__(self, players, space=None, min_generations=5, max_generations=100, eta=3,
+                 seeds=(0,), processes=None, seed=None, verbose=True, **ga_kwargs):
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+        if not 1 <= min_generations <= max_generations:
+            raise ValueError("Expected 1 <= min_generations <= max_generations")
+        self.players = players
+        self.space = DEFAULT_SPACE if space is None else space
+        self.min_generations = min_generations
+        self.max_generations = max_generations
+        self.eta = eta
+        self.seeds = list(seeds)
+        self.processes = processes or os.cpu_count() or 1
+        # Private generator, so that sampling does not depend on (or change) the global state
+        self.rng = random.Random(seed)
+        self.verbose = verbose
+        self.ga_kwargs = ga_kwargs
+        # One record per evaluated (configuration, budget), see evaluate
+        self.trials = []
+        self.pool = None
+
+    def sample_config(self):
+        config = {}
+        for name, values in self.space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    config[name] = self.rng.randint(low, high)
+                else:
+                    config[name] = self.rng.uniform(low, high)
+            else:
+                config[name] = self.rng.choice(values)
+        return config
+
+    def evaluate(self, configs, generations, bracket=0, rung=0):
+        """Runs every configuration for generations generations on every seed;
+        returns their mean best fitness"""
+        jobs = []
+        for i, config in enumerate(configs):
+            kwargs = dict(self.ga_kwargs, generations=generations)
+            kwargs.update((name, value) for name, value in config.items() if name != 'algorithm')
+            for seed in self.seeds:
+                jobs.append((i, self.pool.submit(run_cell, config['algorithm'], seed, kwargs)))
+
+        fitness = [[] for _ in configs]
+        evaluations = [0] * len(configs)
+        wall_time = [0.0] * len(configs)
+        for i, future in jobs:
+            _, _, best_fitness, run_time, run_evaluations, _ = future.result()
+            fitness[i].append(best_fitness)
+            evaluations[i] += run_evaluations
+            wall_time[i] += run_time
+
+        scores = [sum(f) / len(f) for f in fitness]
+        for i, config in enumerate(configs):
+            self.trials.append({'bracket': bracket, 'rung': rung, 'generations': generations,
+                                'config': config, 'fitness': scores[i],
+                                'evaluations': evaluations[i], 'wall_time': wall_time[i]})
+        return scores
+
+    def rung_generations(self, min_generations):
+        """Generations of every rung of a race starting at (about) min_generations: the
+        budget is multiplied by eta at every rung and the last rung runs max_generations"""
+        n_rungs = int(math.log(self.max_generations / min_generations, self.eta) + 1e-9) + 1
+        return [max(1, round(self.max_generations / self.eta ** (n_rungs - 1 - rung))) for rung in range(n_rungs)]
+
+    def successive_halving(self, n_configs, min_generations=None, bracket=0):
+        """
+        Samples n_configs configurations and races them from min_generations
+
+        Returns (config, fitness) of the best configuration of the last rung.
+        """
+        min_generations = self.min_generations if min_generations is None else min_generations
+        configs = [self.sample_config() for _ in range(n_configs)]
+        for rung, generations in enumerate(self.rung_generations(min_generations)):
+            if rung > 0:
+                survivors = max(1, len(configs) // self.eta)
+                configs = [configs[i] for _, i in ranked[:survivors]]
+            start_time = time.time()
+            scores = self.evaluate(configs, generations, bracket, rung)
+            ranked = sorted(zip(scores, range(len(configs))))
+            if self.verbose:
+                print(f"Bracket {bracket} rung {rung}: {len(configs)} configs x {generations} generations, "
+                      f"best {ranked[0][0]:.4f} (Time: {time.time() - start_time:.2f}s)")
+        return configs[ranked[0][1]], ranked[0][0]
+
+    def hyperband(self):
+        """
+        Runs successive halving brackets from the most exploratory (many configurations,
+        min_generations) to a plain random search at max_generations
+
+        Every bracket ends at max_generations, so their survivors are compared on the
+        same budget. Returns (config, fitness) of the winner.
+        """
+        s_max = len(self.rung_generations(self.min_generations)) - 1
+        best_config, best_fitness = None, float('inf')
+        for s in range(s_max, -1, -1):
+            n_configs = math.ceil((s_max + 1) / (s + 1) * self.eta ** s)
+            min_generations = self.max_generations / self.eta ** s
+            config, fitness = self.successive_halving(n_configs, min_generations, bracket=s_max - s)
+            if fitness < best_fitness:
+                best_config, best_fitness = config, fitness
+        return best_config, best_fitness
+
+    def run(self, n_configs=None):
+        """
+        Tunes the hyperparameters and reports the winner: one successive halving
+        over n_configs configurations, or Hyperband when n_configs is None
+
+        Returns (config, fitness) of the winning configuration.
+        """
+        self.trials = []
+        start_time = time.time()
+        with ProcessPoolExecutor(max_workers=self.processes, initializer=init_worker,
+                                 initargs=(self.players,)) as pool:
+            self.pool = pool
+            try:
+                if n_configs is None:
+                    config, fitness = self.hyperband()
+                else:
+                    config, fitness = self.successive_halving(n_configs)
+            finally:
+                self.pool = None
+
+        if self.verbose:
+            runs = len(self.trials) * len(self.seeds)
+            generations = sum(trial['generations'] * len(self.seeds) for trial in self.trials)
+            print(f"{len(self.trials)} trials ({runs} runs, {generations} generations) "
+                  f"in {time.time() - start_time:.2f}s")
+            print(f"Best configuration (fitness {fitness:.4f} over {len(self.seeds)} seeds, "
+                  f"{self.max_generations} generations):")
+            for name, value in config.items():
+                print(f"  {name}: {value}")
+        return config, fitness
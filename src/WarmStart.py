@@ -0,0 +1,109 @@
+import csv
+import random
+
+import numpy as np
+
+from Checkpoint import load_checkpoint
+from League import League
+
+
+# Columns of the exported solution file (best_solution.csv)
+CSV_COLUMNS = ('Team', 'PlayerID', 'Name', 'Position', 'Skill', 'Salary')
+
+
+def save_league_csv(league, path):
+    """Exports a league as best_solution.csv: one row per player, teams numbered from 1"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for i, team in enumerate(league.teams):
+            for player in team.players:
+                writer.writerow([f"Team {i + 1}", player.id, player.name, player.position,
+                                 player.skill, player.salary])
+
+
+def assignment_from_csv(path):
+    """Reads an exported solution as an assignment: one list of player ids per team"""
+    teams = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            team = int(row['Team'].split()[-1]) - 1
+            teams.setdefault(team, []).append(int(row['PlayerID']))
+    return [teams.get(i, []) for i in range(max(teams, default=-1) + 1)]
+
+
+def assignments_from_leagues(leagues):
+    """Assignments (lists of player ids per team) of a list of leagues"""
+    return [[[player.id for player in team.players] for team in league.teams] for league in leagues]
+
+
+def assignments_from_checkpoint(checkpoint, players=None):
+    """
+    Assignments of a checkpoint (path or dict returned by load_checkpoint), best first:
+    the best solution followed by the population sorted by fitness
+
+    Genomes refer to players by index; checkpoints written before the player ids were
+    saved are decoded with the order of players (the player list of the run).
+    """
+    if isinstance(checkpoint, str):
+        checkpoint = load_checkpoint(checkpoint)
+    if 'player_ids' in checkpoint:
+        player_ids = checkpoint['player_ids'].tolist()
+    elif players is not None:
+        player_ids = [player.id for player in players]
+    else:
+        raise ValueError("Checkpoint without player ids: pass the player list of the run")
+
+    def decode(order, sizes):
+        teams, start = [], 0
+        for size in sizes:
+            teams.append([player_ids[i] for i in order[start:start + size]])
+            start += size
+        return teams
+
+    assignments = [decode(checkpoint['best_members'].tolist(), checkpoint['best_sizes'].tolist())]
+    ranking = np.argsort(checkpoint['population_fitness'], kind='stable')
+    members, team_sizes = checkpoint['members'].tolist(), checkpoint['team_sizes'].tolist()
+    assignments += [decode(members[i], team_sizes[i]) for i in ranking.tolist()]
+    return assignments
+
+
+def repair_assignment(assignment, players, problem):
+    """
+    Rebuilds a league from an assignment against an updated player list
+
+    Players are matched by id, so changed salaries and skills are picked up and
+    removed players are dropped. Extra teams are dissolved and players beyond their
+    position's quota are released; the free slots are then filled with random
+    unassigned players of the same position (new players included), so every team
+    of the returned league has a valid formation whenever the pool allows it.
+    """
+    by_id = {player.id: player for player in players}
+    league = League(problem)
+    assigned = set()
+    for team, ids in zip(league.teams, assignment):
+        counts = dict.fromkeys(problem.positions, 0)
+        for player_id in ids:
+            player = by_id.get(player_id)
+            if player is None or player.id in assigned or player.position not in counts:
+                continue
+            if counts[player.position] < problem.formation[player.position]:
+                counts[player.position] += 1
+                team.add_player(player)
+                assigned.add(player.id)
+
+    # Free players of every position, in random order
+    free = {pos: [] for pos in problem.positions}
+    for player in players:
+        if player.id not in assigned and player.position in free:
+            free[player.position].append(player)
+    for pool in free.values():
+        random.shuffle(pool)
+
+    for team in league.teams:
+        for i, pos in enumerate(problem.positions):
+            for _ in range(problem.formation[pos] - team.pos_counts[i]):
+                if not free[pos]:
+                    break
+                team.add_player(free[pos].pop())
+    return league
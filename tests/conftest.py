@@ -0,0 +1,26 @@
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+# The modules live in a flat src/ directory and import each other by name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PlayerStore import DATA_PATH, load_player_store
+
+
+@pytest.fixture(scope='session')
+def players():
+    """The players of the CSV shipped in Data/"""
+    return load_player_store(DATA_PATH, use_cache=False).players()
+
+
+@pytest.fixture
+def seeded():
+    """Seeds both generators used by the algorithms"""
+    def seed(value):
+        random.seed(value)
+        np.random.seed(value)
+    return seed
@@ -0,0 +1,115 @@
+import math
+from itertools import combinations, product
+
+import pytest
+
+import GeneticAlgorithm
+from BranchAndBound import BranchAndBound
+from League import League, LeagueStats
+from PlayerGenerator import generate_players
+from Problem import Problem
+
+
+def position_splits(players, n_teams, quota):
+    """Every way of giving quota of the players to each of n_teams teams (the rest stay out),
+    as per-team (skill, salary) totals"""
+    if n_teams == 0:
+        yield ()
+        return
+    for chosen in combinations(players, quota):
+        rest = [p for p in players if p not in chosen]
+        for split in position_splits(rest, n_teams - 1, quota):
+            yield (sum(p.skill for p in chosen), sum(p.salary for p in chosen)), *split
+
+
+def brute_force_v(players, problem):
+    """Smallest V = n * sum(S^2) - sum(S)^2 over all feasible leagues, inf when none exists"""
+    n = problem.num_teams
+    splits = [set(position_splits([p for p in players if p.position == pos], n, problem.formation[pos]))
+              for pos in problem.positions]
+    best = math.inf
+    for combination in product(*splits):
+        skills = [sum(split[t][0] for split in combination) for t in range(n)]
+        salaries = [sum(split[t][1] for split in combination) for t in range(n)]
+        if max(salaries) <= problem.budget_limit:
+            best = min(best, n * sum(s * s for s in skills) - sum(skills) ** 2)
+    return best
+
+
+CASES = [
+    # (num_teams, formation, surplus)
+    (3, {'GK': 1, 'DEF': 2}, 0.0),
+    (3, {'GK': 1, 'DEF': 2, 'FWD': 1}, 0.0),
+    (4, {'GK': 1, 'DEF': 1, 'FWD': 1}, 0.0),
+    (2, {'GK': 1, 'DEF': 2, 'MID': 2}, 0.0),
+    (3, {'GK': 1, 'DEF': 1, 'FWD': 1}, 0.34),
+    (2, {'GK': 1, 'DEF': 2, 'FWD': 1}, 0.5),
+]
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('budget', ['unlimited', 'below_optimum', 'tight'])
+@pytest.mark.parametrize('num_teams, formation, surplus', CASES)
+def test_branch_and_bound_matches_brute_force(num_teams, formation, surplus, budget, seed):
+    problem = Problem(num_teams=num_teams, formation=formation, budget_limit=10**6)
+    players = generate_players(problem, seed=seed, surplus=surplus)
+    if budget == 'below_optimum':
+        # Rules out the unconstrained optimum, and sometimes every league
+        optimum, _, _ = BranchAndBound(players, problem, verbose=False).solve()
+        budget_limit = max(team.total_salary for team in optimum.teams) - 1
+        problem = Problem(num_teams=num_teams, formation=formation, budget_limit=budget_limit)
+    elif budget == 'tight':
+        # 85 per player rules out most leagues
+        problem = Problem(num_teams=num_teams, formation=formation, budget_limit=85 * sum(formation.values()))
+
+    bb = BranchAndBound(players, problem, verbose=False)
+    solution, fitness, lower_bound = bb.solve()
+    expected = brute_force_v(players, problem)
+
+    if expected == math.inf:
+        assert bb.status == 'infeasible'
+        assert solution is None and fitness == float('inf')
+        return
+    assert bb.status == 'optimal'
+    assert fitness == bb.fitness(expected)
+    assert lower_bound == fitness
+    assert solution.is_valid()
+    assert bb.league_v(solution) == expected
+    assert LeagueStats.from_league(solution).fitness() == pytest.approx(fitness, abs=1e-12)
+
+
+def test_incumbent_is_kept_when_optimal():
+    problem = Problem(num_teams=3, formation={'GK': 1, 'DEF': 2})
+    pool = generate_players(problem, seed=1)
+    bb = BranchAndBound(pool, problem, verbose=False)
+    solution, fitness, _ = bb.solve()
+    # Solving again from the optimum finds nothing better
+    again, again_fitness, _ = BranchAndBound(pool, problem, verbose=False).solve(incumbent=solution)
+    assert again is solution and again_fitness == fitness
+
+
+def test_player_csv_optimum_beats_ga(players, seeded):
+    bb = BranchAndBound(players, verbose=False, max_time=60)
+    solution, fitness, lower_bound = bb.solve()
+    assert bb.status == 'optimal' and lower_bound == fitness
+    assert sorted(p.id for team in solution.teams for p in team.players) == sorted(p.id for p in players)
+
+    seeded(0)
+    ga = GeneticAlgorithm.GeneticAlgorithm_tournament_swap_teamrepair(players, pop_size=30, generations=20,
+                                                                      verbose=False)
+    ga.run()
+    assert fitness <= ga.best_fitness
+
+
+def test_incumbent_reusing_players_is_rejected(players):
+    # Team 0 copied into every team: valid formations and budgets, V = 0
+    bb = BranchAndBound(players, verbose=False, max_time=60)
+    optimum, _, _ = bb.solve()
+    cheat = League.from_teams([optimum.teams[0]] * len(optimum.teams), optimum.problem)
+    assert cheat.is_valid()
+    assert bb.league_v(cheat) is None
+
+    solution, fitness, lower_bound = BranchAndBound(players, verbose=False, max_time=60).solve(incumbent=cheat)
+    assert solution is not cheat
+    assert fitness == bb.best_fitness and lower_bound == fitness and fitness > 0
+    assert sorted(p.id for team in solution.teams for p in team.players) == sorted(p.id for p in players)
@@ -0,0 +1,92 @@
+import shutil
+
+import numpy as np
+import pytest
+
+import GeneticAlgorithm
+from ArrayEngine import ArrayEngine
+from Checkpoint import load_checkpoint
+from LocalSearch import HillClimbing, SimulatedAnnealing, TabuSearch
+from PlayerGenerator import generate_players
+from Problem import Problem
+
+
+def assignment(league):
+    return [[p.id for p in team.players] for team in league.teams]
+
+
+def run_with_snapshot(algorithm, tmp_path, snapshot_generation, interval):
+    """Runs algorithm with checkpoints, keeping a copy of the one written at snapshot_generation"""
+    path, snapshot = tmp_path / 'run.npz', tmp_path / 'snapshot.npz'
+
+    def keep(record):
+        if record['generation'] == snapshot_generation:
+            shutil.copy(path, snapshot)
+    algorithm.add_observer(keep)
+    result = algorithm.run(checkpoint_path=str(path), checkpoint_interval=interval)
+    return result, str(snapshot)
+
+
+@pytest.mark.parametrize('name, kwargs', [
+    ('GeneticAlgorithm_tournament_swap_team', {}),
+    ('GeneticAlgorithm_roulette_wheel_scramble_positionbasedrepair', {}),
+    ('GeneticAlgorithm_tournament_positionshuffle_teamrepair', {'dedup': True, 'adaptive_mutation': True}),
+])
+def test_ga_resume_matches_uninterrupted_run(players, tmp_path, seeded, name, kwargs):
+    cls = GeneticAlgorithm.ALGORITHMS[name]
+    # The fitness cache is not checkpointed: without it the counters match as well
+    kwargs = dict(kwargs, cache_size=0)
+    seeded(5)
+    ga = cls(players, pop_size=30, generations=30, verbose=False, **kwargs)
+    (best, history), snapshot = run_with_snapshot(ga, tmp_path, 14, 15)
+
+    # The RNG states come from the checkpoint, not from the current seed
+    seeded(999)
+    resumed = cls(players, pop_size=30, generations=30, verbose=False, **kwargs)
+    resumed_best, resumed_history = resumed.resume(snapshot)
+
+    assert resumed_history == history
+    assert assignment(resumed_best) == assignment(best)
+    assert [assignment(league) for league in resumed.population] == [assignment(league) for league in ga.population]
+    assert resumed.counters() == ga.counters()
+
+
+@pytest.mark.parametrize('cls, kwargs', [
+    (SimulatedAnnealing, {'initial_temperature': 0.5, 'cooling_rate': 0.99}),
+    (TabuSearch, {'neighbourhood_size': 20}),
+    (HillClimbing, {'neighbourhood_size': 10}),
+])
+def test_local_search_resume_matches_uninterrupted_run(players, tmp_path, seeded, cls, kwargs):
+    seeded(4)
+    search = cls(players, iterations=400, verbose=False, **kwargs)
+    (best, history), snapshot = run_with_snapshot(search, tmp_path, 199, 200)
+
+    seeded(999)
+    resumed = cls(players, iterations=400, verbose=False, **kwargs)
+    resumed_best, resumed_history = resumed.resume(snapshot)
+
+    assert resumed_history == history
+    assert assignment(resumed_best) == assignment(best)
+    assert resumed.counters() == search.counters()
+    # The search state saved with checkpoint_state is restored as well
+    for name, value in search.checkpoint_state().items():
+        np.testing.assert_array_equal(resumed.checkpoint_state()[name], value)
+
+
+def test_pack_population_round_trips_player_indices_over_int16():
+    # 5000 teams of 7 players: indices go past the int16 range
+    problem = Problem(num_teams=5000)
+    players = generate_players(problem, seed=0)
+    engine = ArrayEngine(players, problem)
+    genomes = engine.random_population(2)
+    members, team_sizes = engine.pack_population(engine.decode_population(genomes))
+    assert members.dtype == np.int32
+    assert members.max() == len(players) - 1
+    np.testing.assert_array_equal(engine.encode_population(engine.unpack_population(members, team_sizes)), genomes)
+
+
+def test_small_pools_keep_int16_player_indices(players, tmp_path, seeded):
+    seeded(0)
+    ga = GeneticAlgorithm.GeneticAlgorithm_tournament_swap_team(players, pop_size=10, generations=2, verbose=False)
+    ga.run(checkpoint_path=str(tmp_path / 'run.npz'), checkpoint_interval=1)
+    assert load_checkpoint(str(tmp_path / 'run.npz'))['members'].dtype == np.int16
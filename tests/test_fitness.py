@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+import GeneticAlgorithm
+from CrossoverMethods import CrossoverMethods
+from League import LeagueStats
+from MutationMethods import MutationMethods
+from Problem import Problem
+
+
+def reference_fitness(league):
+    """Fitness recomputed from the players, without any cached aggregate"""
+    problem = league.problem
+    for team in league.teams:
+        counts = [sum(p.position == pos for p in team.players) for pos in problem.positions]
+        if counts != [problem.formation[pos] for pos in problem.positions]:
+            return 1000.0
+        salary = sum(p.salary for p in team.players)
+        if salary > problem.budget_limit:
+            return 500.0 + (salary - problem.budget_limit)
+    return float(np.std([np.mean([p.skill for p in team.players]) for team in league.teams]))
+
+
+def assert_team_totals(league):
+    for team in league.teams:
+        assert team.total_skill == sum(p.skill for p in team.players)
+        assert team.total_salary == sum(p.salary for p in team.players)
+        assert team.pos_counts == tuple(sum(p.position == pos for p in team.players)
+                                        for pos in league.problem.positions)
+
+
+# A tight budget makes most leagues pay the budget penalty, a huge one none
+@pytest.fixture(params=[750, 700, 10**6])
+def ga(request, players):
+    problem = Problem(budget_limit=request.param)
+    return GeneticAlgorithm.BaseGeneticAlgorithm(players, problem=problem, cache_size=0, verbose=False)
+
+
+def test_full_and_batched_fitness_match_reference(ga, seeded):
+    seeded(0)
+    population = [ga.create_random_individual() for _ in range(50)]
+    batch = ga.engine.fitness_batch(ga.engine.encode_population(population))
+    for league, batched in zip(population, batch):
+        assert_team_totals(league)
+        expected = reference_fitness(league)
+        assert LeagueStats.from_league(league).fitness() == pytest.approx(expected, abs=1e-12)
+        assert batched == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.mark.parametrize('mutation', [MutationMethods.swap_mutation, MutationMethods.scramble_mutation])
+def test_incremental_mutation_fitness_matches_full(ga, seeded, mutation):
+    seeded(1)
+    population = [ga.create_random_individual() for _ in range(10)]
+    ga.evaluate_population(population)
+    for league in population:
+        # Chains of mutants, every one scored from the aggregates of its parent
+        for _ in range(30):
+            child = mutation(league, mutation_rate=1.0)
+            assert child.stats is not None
+            assert_team_totals(child)
+            assert child.stats.fitness() == pytest.approx(reference_fitness(child), abs=1e-12)
+            assert child.stats.fitness() == pytest.approx(LeagueStats.from_league(child).fitness(), abs=1e-12)
+            league = child
+
+
+def test_incremental_crossover_fitness_matches_full(ga, players, seeded):
+    seeded(2)
+    population = [ga.create_random_individual() for _ in range(20)]
+    ga.evaluate_population(population)
+    # Children of a league and of its mutants share most teams, so many of them are valid
+    children = []
+    for parent in population:
+        mutant = MutationMethods.swap_mutation(parent, mutation_rate=1.0)
+        for _ in range(5):
+            child = CrossoverMethods.team_based_crossover(parent, mutant, len(players))
+            if child is not None:
+                children.append(child)
+    assert children
+    for child in children:
+        assert child.stats is not None
+        assert child.stats.fitness() == pytest.approx(reference_fitness(child), abs=1e-12)
+
+
+def test_moves_across_positions_update_the_formation_penalty(ga, seeded):
+    seeded(3)
+    league = ga.create_random_individual()
+    stats = LeagueStats.from_league(league)
+    gk = next(p for p in league.teams[0].players if p.position == 'GK')
+    fwd = next(p for p in league.teams[1].players if p.position == 'FWD')
+    # The forward of team 1 goes to team 0 and the goalkeeper of team 0 to team 1
+    stats.apply_move(0, 1, fwd, gk)
+    assert stats.fitness() == 1000.0
+    stats.apply_move(0, 1, gk, fwd)
+    assert stats.fitness() == pytest.approx(reference_fitness(league), abs=1e-12)
+
+
+def test_run_scores_incrementally_and_consistently(players, seeded):
+    seeded(4)
+    ga = GeneticAlgorithm.GeneticAlgorithm_tournament_swap_teamrepair(players, pop_size=30, generations=15,
+                                                                      cache_size=0, verbose=False)
+    ga.run()
+    assert ga.incremental_evaluations > 0
+    assert ga.best_fitness == pytest.approx(reference_fitness(ga.best_solution), abs=1e-12)
+    for league, fit in zip(ga.population, ga.population_fitness):
+        assert fit == pytest.approx(reference_fitness(league), abs=1e-12)
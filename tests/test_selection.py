@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+import GeneticAlgorithm
+from SelectionMethods import RouletteWheelSampler, SelectionMethods, TournamentSampler
+
+
+@pytest.mark.parametrize('pop_size, tournament_size', [(1000, 3), (10, 3), (10, 8), (5, 5)])
+def test_tournament_contestants_are_distinct_and_uniform(seeded, pop_size, tournament_size):
+    seeded(0)
+    contestants = SelectionMethods.tournament_contestants(pop_size, 20000, tournament_size)
+    assert contestants.shape == (20000, tournament_size)
+    assert all(len(set(row)) == tournament_size for row in contestants.tolist())
+    frequencies = np.bincount(contestants.ravel(), minlength=pop_size) / contestants.size
+    assert frequencies == pytest.approx(np.full(pop_size, 1 / pop_size), abs=0.05 / pop_size ** 0.5)
+
+
+def test_tournament_winner_distribution(seeded):
+    seeded(1)
+    population = list(range(10))
+    winners = SelectionMethods.tournament_selection_batch(population, np.arange(10.0), 100000, 3)
+    # Individual i wins when it is the best of 3 distinct contestants: C(9 - i, 2) / C(10, 3)
+    expected = [(9 - i) * (8 - i) / 2 / 120 for i in range(10)]
+    assert np.bincount(winners, minlength=10) / 100000 == pytest.approx(expected, abs=0.01)
+
+
+def test_tournament_larger_than_population():
+    with pytest.raises(ValueError):
+        SelectionMethods.tournament_contestants(3, 1, 4)
+
+
+def test_roulette_wheel_sampler_follows_updated_weights(seeded):
+    seeded(2)
+    fitnesses = np.random.random(13) * 3
+    sampler = RouletteWheelSampler(fitnesses)
+    # Fewer updates than slots, so the tree is updated in place and not rebuilt
+    for slot in [3, 7, 3, 12, 0]:
+        fitnesses[slot] = np.random.random() * 3
+        sampler.update(slot, fitnesses[slot])
+    weights = 1.0 / (fitnesses + 0.01)
+    assert sampler.total == pytest.approx(weights.sum())
+    frequencies = np.bincount(sampler.sample(200000), minlength=13) / 200000
+    assert frequencies == pytest.approx(weights / weights.sum(), abs=0.005)
+
+
+def test_tournament_sampler_reads_the_shared_fitnesses(seeded):
+    seeded(3)
+    fitnesses = np.arange(10.0)
+    sampler = TournamentSampler(fitnesses)
+    fitnesses[9] = -1.0
+    sampler.update(9, -1.0)
+    winners = np.bincount(sampler.sample(30000), minlength=10) / 30000
+    # The new best wins every tournament it is drawn in: 3 slots out of 10
+    assert winners[9] == pytest.approx(0.3, abs=0.01)
+
+
+@pytest.mark.parametrize('selection', ['tournament', 'roulette_wheel'])
+def test_steady_state_replacements_keep_the_sampler_in_sync(players, seeded, selection):
+    seeded(4)
+    ga = GeneticAlgorithm.ALGORITHMS[f'GeneticAlgorithm_{selection}_swap_teamrepair'](
+        players, pop_size=30, generations=10, steady_state=True, verbose=False)
+    ga.run()
+    assert ga.replacements > 0
+    fresh = ga.steady_selection(ga.population_fitness)
+    if selection == 'roulette_wheel':
+        assert ga.sampler.weights == pytest.approx(fresh.weights)
+        assert ga.sampler.total == pytest.approx(fresh.total)
+    else:
+        assert ga.sampler.fitnesses is ga.population_fitness